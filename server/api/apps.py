@@ -1,7 +1,21 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    # WAL permite lecturas concurrentes con un escritor; synchronous=NORMAL es
+    # seguro en WAL y evita un fsync por transacción.
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode=WAL;')
+            cursor.execute('PRAGMA synchronous=NORMAL;')
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
 
+    def ready(self):
+        from .cache import connect_signals
+        connect_signals()
+        connection_created.connect(configure_sqlite, dispatch_uid='api_configure_sqlite')
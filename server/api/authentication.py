@@ -0,0 +1,21 @@
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+
+from .cache import usuarios_activos
+
+
+class ClaimsJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    Autenticación JWT sin consultar la tabla de usuarios en cada petición.
+
+    Confía en los claims firmados del token (IdUsuario, IdTipoUsuario) y solo
+    verifica que el usuario siga activo contra la caché ``usuarios_activos``,
+    que se invalida cuando cambia un Usuario (los Ids que no están en la caché
+    se consultan uno por uno).
+    """
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        if usuarios_activos.get(user.id) is None:
+            raise AuthenticationFailed('Usuario inactivo', code='user_inactive')
+        return user
@@ -0,0 +1,263 @@
+"""
+Caché en memoria de las tablas de catálogo (Estado, TipoProducto, TipoUsuario, Mesa)
+y del menú de productos.
+
+Cada catálogo se carga completo en una consulta y se sirve desde memoria hasta
+que una escritura lo invalida (señales post_save/post_delete) o vence el TTL
+``CATALOG_CACHE_TTL``. El TTL acota cuánto tarda un proceso en ver cambios
+hechos por otro proceso o con ``update()``/``bulk_create()``, que no emiten
+señales.
+
+Los usuarios activos se guardan igual que un catálogo (con su propio TTL,
+``USUARIOS_ACTIVOS_TTL``) y sirven como lista de revocación de tokens; un Id
+que no está en la copia se verifica con una consulta de una fila.
+
+El menú se versiona con la secuencia ``menu`` en la base de datos para que
+todos los procesos compartan la misma versión (y el mismo ETag); el cuerpo ya
+renderizado se guarda en memoria por versión.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.utils.module_loading import import_string
+
+from .idempotencia import recientes as idempotencia_recientes
+from .models import Estado, Mesa, Persona, Producto, Secuencia, TipoProducto, TipoUsuario, Usuario
+
+
+MENU_SECUENCIA = 'menu'
+
+
+class _Snapshot:
+    __slots__ = ('version', 'expires', 'instances', 'by_pk', 'by_name', 'data', 'data_by_pk')
+
+    def __init__(self, version, expires, instances, data):
+        self.version = version
+        self.expires = expires
+        self.instances = instances
+        self.by_pk = {instance.pk: instance for instance in instances}
+        self.by_name = {str(instance): instance for instance in instances}
+        self.data = data
+        self.data_by_pk = {instance.pk: item for instance, item in zip(instances, data)}
+
+
+class CatalogCache:
+    """
+    Copia versionada de una tabla pequeña.
+
+    Las instancias retornadas se comparten entre hilos: se pueden asignar a
+    llaves foráneas pero no se deben modificar.
+    """
+
+    def __init__(self, model, serializer_class, queryset=None, ttl_setting='CATALOG_CACHE_TTL'):
+        self.model = model
+        self.serializer_path = serializer_class
+        self.queryset = queryset
+        self.ttl_setting = ttl_setting
+        self.version = 0
+        # Contadores sin lock: una pérdida ocasional es aceptable para métricas.
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._snapshot = None
+
+    def invalidate(self):
+        with self._lock:
+            self.version += 1
+            self._snapshot = None
+
+    def _get_snapshot(self):
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.expires > time.monotonic():
+            self.hits += 1
+            return snapshot
+
+        self.misses += 1
+        version = self.version
+        instances = list(self.queryset() if self.queryset else self.model.objects.all())
+        serializer_class = import_string(self.serializer_path)
+        snapshot = _Snapshot(
+            version,
+            time.monotonic() + getattr(settings, self.ttl_setting, 300),
+            instances,
+            serializer_class(instances, many=True).data,
+        )
+        with self._lock:
+            # Si hubo una escritura mientras se cargaba, no guardar datos viejos.
+            if self.version == version:
+                self._snapshot = snapshot
+        return snapshot
+
+    def is_warm(self):
+        """True si hay una copia cargada y vigente (la siguiente lectura no consulta la base de datos)."""
+        snapshot = self._snapshot
+        return snapshot is not None and snapshot.expires > time.monotonic()
+
+    def all(self):
+        return self._get_snapshot().instances
+
+    def get(self, pk):
+        """Retorna la instancia con ese Id o None."""
+        try:
+            return self._get_snapshot().by_pk.get(int(pk))
+        except (TypeError, ValueError):
+            return None
+
+    def get_by_name(self, name):
+        return self._get_snapshot().by_name.get(name)
+
+    def data(self):
+        """Lista serializada, igual a la que produce el serializer del catálogo."""
+        return self._get_snapshot().data
+
+    def get_data(self, pk):
+        try:
+            return self._get_snapshot().data_by_pk.get(int(pk))
+        except (TypeError, ValueError):
+            return None
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'version': self.version,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else None,
+        }
+
+
+catalogs = {
+    Estado: CatalogCache(Estado, 'api.serializers.EstadoSerializer'),
+    TipoProducto: CatalogCache(TipoProducto, 'api.serializers.TipoProductoSerializer'),
+    TipoUsuario: CatalogCache(TipoUsuario, 'api.serializers.TipoUsuarioSerializer'),
+    Mesa: CatalogCache(Mesa, 'api.serializers.MesaSerializer'),
+}
+
+
+def _usuarios_activos():
+    return Usuario.objects.select_related(
+        'IdPersona', 'IdTipoUsuario', 'IdEstado'
+    ).filter(IdEstado__Estado='Activo')
+
+
+class UsuariosActivosCache(CatalogCache):
+    """
+    Usuarios activos: la autenticación por token consulta aquí en lugar de la
+    base de datos; un usuario ausente (inactivo o eliminado) se trata como revocado.
+
+    Un Id que no está en la copia se busca con una consulta de una fila, porque
+    pudo crearse o reactivarse en otro proceso después de cargarla; si está
+    activo, la copia se recarga para incluirlo.
+    """
+
+    def _activo_en_base(self, pk):
+        try:
+            activo = self.queryset().filter(pk=pk).exists()
+        except (TypeError, ValueError):
+            return False
+        if activo:
+            self.invalidate()
+        return activo
+
+    def get(self, pk):
+        usuario = super().get(pk)
+        if usuario is None and self._activo_en_base(pk):
+            usuario = super().get(pk)
+        return usuario
+
+    def get_data(self, pk):
+        data = super().get_data(pk)
+        if data is None and self._activo_en_base(pk):
+            data = super().get_data(pk)
+        return data
+
+
+usuarios_activos = UsuariosActivosCache(
+    Usuario, 'api.serializers.UsuarioSerializer',
+    queryset=_usuarios_activos, ttl_setting='USUARIOS_ACTIVOS_TTL'
+)
+
+
+class MenuCache:
+    """Cuerpos renderizados del menú para una sola versión; al cambiar la versión se descartan."""
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._version = None
+        self._bodies = {}
+
+    def get(self, version, key):
+        with self._lock:
+            body = self._bodies.get(key) if version == self._version else None
+        if body is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return body
+
+    def set(self, version, key, body):
+        with self._lock:
+            if version != self._version:
+                self._version = version
+                self._bodies = {}
+            if len(self._bodies) < self.max_entries:
+                self._bodies[key] = body
+
+    def clear(self):
+        with self._lock:
+            self._version = None
+            self._bodies = {}
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'version': self._version,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else None,
+        }
+
+
+menu_cache = MenuCache()
+
+
+def get_catalog(model):
+    return catalogs[model]
+
+
+def stats():
+    data = {model._meta.db_table: catalog.stats() for model, catalog in catalogs.items()}
+    data['menu'] = menu_cache.stats()
+    data['usuarios_activos'] = usuarios_activos.stats()
+    data['idempotencia'] = idempotencia_recientes.stats()
+    return data
+
+
+def _invalidate(sender, **kwargs):
+    catalogs[sender].invalidate()
+
+
+def _invalidate_usuarios(sender, **kwargs):
+    usuarios_activos.invalidate()
+
+
+def _invalidate_menu(sender, **kwargs):
+    # El menú incluye el nombre del tipo y del estado de cada producto.
+    Secuencia.siguiente(MENU_SECUENCIA)
+
+
+def connect_signals():
+    for model in catalogs:
+        post_save.connect(_invalidate, sender=model, dispatch_uid=f'catalog_cache_save_{model.__name__}')
+        post_delete.connect(_invalidate, sender=model, dispatch_uid=f'catalog_cache_delete_{model.__name__}')
+    for model in (Producto, TipoProducto, Estado):
+        post_save.connect(_invalidate_menu, sender=model, dispatch_uid=f'menu_cache_save_{model.__name__}')
+        post_delete.connect(_invalidate_menu, sender=model, dispatch_uid=f'menu_cache_delete_{model.__name__}')
+    for model in (Usuario, Persona, Estado, TipoUsuario):
+        post_save.connect(_invalidate_usuarios, sender=model, dispatch_uid=f'usuarios_cache_save_{model.__name__}')
+        post_delete.connect(_invalidate_usuarios, sender=model, dispatch_uid=f'usuarios_cache_delete_{model.__name__}')
@@ -0,0 +1,156 @@
+"""
+Eventos de órdenes para las pantallas de cocina y meseros.
+
+Las vistas publican deltas pequeños (orden creada, cambio de estado, productos
+agregados, orden eliminada) en un broker configurable mediante
+``ORDER_EVENTS`` en settings. El broker por
+defecto reparte los eventos en memoria dentro del mismo proceso; un backend
+externo (por ejemplo Redis pub/sub) solo necesita implementar ``publish`` y
+``subscribe`` con la misma interfaz que ``InProcessBroker``.
+"""
+import asyncio
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+from rest_framework import serializers
+
+
+ORDEN_CREADA = 'orden.creada'
+ORDEN_ESTADO = 'orden.estado'
+ORDEN_PRODUCTOS = 'orden.productos'
+ORDEN_ELIMINADA = 'orden.eliminada'
+
+
+class Subscription:
+    """Cola de eventos de un cliente conectado, ligada a su event loop."""
+
+    def __init__(self, broker, max_queue):
+        self.broker = broker
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=max_queue)
+
+    def put(self, event):
+        # Se ejecuta dentro del loop del suscriptor. Si el cliente se atrasa
+        # se descarta el evento más antiguo en lugar de crecer sin límite.
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class InProcessBroker:
+    """Broker en memoria: reparte cada evento a todos los suscriptores del proceso."""
+
+    def __init__(self, max_queue=100):
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+
+    def subscribe(self):
+        subscription = Subscription(self, self.max_queue)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event):
+        # Puede llamarse desde cualquier hilo (workers WSGI o sync_to_async).
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, event)
+            except RuntimeError:
+                # El loop del suscriptor ya se cerró.
+                self.unsubscribe(subscription)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                config = getattr(settings, 'ORDER_EVENTS', {})
+                backend = import_string(config.get('BACKEND', 'api.events.InProcessBroker'))
+                _broker = backend(**config.get('OPTIONS', {}))
+    return _broker
+
+
+def publish(event):
+    """Publica el evento cuando la transacción actual se confirme."""
+    transaction.on_commit(lambda: get_broker().publish(event))
+
+
+# Mismo formato (zona horaria local) que ``FechaCreacion`` en la API REST
+_fecha_field = serializers.DateTimeField()
+
+
+def publish_orden_creada(orden):
+    publish({
+        'type': ORDEN_CREADA,
+        'orden': {
+            'IdOrden': orden.IdOrden,
+            'IdUsuario': orden.IdUsuario_id,
+            'IdMesa': orden.IdMesa_id,
+            'IdEstado': orden.IdEstado_id,
+            'FechaCreacion': _fecha_field.to_representation(orden.FechaCreacion),
+            'Version': orden.Version,
+            'Productos': [
+                {
+                    'IdProducto': linea.IdProducto_id,
+                    'Cantidad': linea.Cantidad,
+                    'Notas': linea.Notas,
+                }
+                for linea in orden.productos_orden.all()
+            ],
+        },
+    })
+
+
+def publish_orden_estado(orden):
+    publish({
+        'type': ORDEN_ESTADO,
+        'orden': {
+            'IdOrden': orden.IdOrden,
+            'IdEstado': orden.IdEstado_id,
+            'Version': orden.Version,
+        },
+    })
+
+
+def publish_orden_productos(resultado):
+    """Productos agregados a una orden, con la cantidad final de cada uno."""
+    publish({
+        'type': ORDEN_PRODUCTOS,
+        'orden': resultado,
+    })
+
+
+def publish_orden_eliminada(id_orden, version):
+    publish({
+        'type': ORDEN_ELIMINADA,
+        'orden': {
+            'IdOrden': id_orden,
+            'Version': version,
+        },
+    })
@@ -0,0 +1,145 @@
+"""
+Serialización rápida para los endpoints de lectura más usados.
+
+Producen exactamente el mismo JSON que ``ProductoSerializer``,
+``UsuarioSerializer`` y ``OrdenSerializer``, pero leen las filas con
+``values_list()`` en una o dos consultas y arman los diccionarios a mano, sin
+instanciar modelos ni recorrer los campos de DRF. Se activan por viewset con
+``FAST_SERIALIZERS`` en settings (ver ``FastSerializerMixin``).
+"""
+from rest_framework import serializers
+
+from .models import Producto, Usuario, Orden, ProductoOrden
+
+
+_fecha_field = serializers.DateTimeField()
+
+
+class FastSerializer:
+    """Interfaz mínima de serializer de solo lectura (``data``) sobre instancias o Ids."""
+    model = None
+    # Campos que debe cargar el queryset liviano del viewset (ordenamiento, paginación).
+    key_fields = ()
+
+    def __init__(self, instance=None, many=False, **kwargs):
+        self.instance = instance
+        self.many = many
+        self.context = kwargs.get('context', {})
+
+    @property
+    def data(self):
+        instances = list(self.instance) if self.many else [self.instance]
+        pks = [instance.pk for instance in instances]
+        rows = self.rows(pks)
+        data = [rows[pk] for pk in pks if pk in rows]
+        return data if self.many else data[0]
+
+    def rows(self, pks):
+        """Retorna ``{pk: dict}`` para los Ids dados."""
+        raise NotImplementedError
+
+
+def _producto(IdProducto, IdTipoProducto, NombreProducto, Valor, IdEstado, TipoProducto, Estado):
+    return {
+        'IdProducto': IdProducto,
+        'IdTipoProducto': IdTipoProducto,
+        'NombreProducto': NombreProducto,
+        'Valor': float(Valor),
+        'IdEstado': IdEstado,
+        'TipoProducto': {'IdTipoProducto': IdTipoProducto, 'TipoProducto': TipoProducto},
+        'Estado': {'IdEstado': IdEstado, 'Estado': Estado},
+    }
+
+
+_PRODUCTO_COLUMNS = (
+    'IdProducto', 'IdTipoProducto', 'NombreProducto', 'Valor', 'IdEstado',
+    'IdTipoProducto__TipoProducto', 'IdEstado__Estado',
+)
+
+
+def _usuario(IdUsuario, IdPersona, IdTipoUsuario, Username, IdEstado,
+             PrimerNombre, SegundoNombre, PrimerApellido, SegundoApellido, TipoUsuario, Estado):
+    return {
+        'IdUsuario': IdUsuario,
+        'IdPersona': IdPersona,
+        'IdTipoUsuario': IdTipoUsuario,
+        'Username': Username,
+        'IdEstado': IdEstado,
+        'Persona': {
+            'idPersona': IdPersona,
+            'PrimerNombre': PrimerNombre,
+            'SegundoNombre': SegundoNombre,
+            'PrimerApellido': PrimerApellido,
+            'SegundoApellido': SegundoApellido,
+        },
+        'TipoUsuario': {'IdTipoUsuario': IdTipoUsuario, 'TipoUsuario': TipoUsuario},
+        'Estado': {'IdEstado': IdEstado, 'Estado': Estado},
+    }
+
+
+_USUARIO_COLUMNS = (
+    'IdUsuario', 'IdPersona', 'IdTipoUsuario', 'Username', 'IdEstado',
+    'IdPersona__PrimerNombre', 'IdPersona__SegundoNombre',
+    'IdPersona__PrimerApellido', 'IdPersona__SegundoApellido',
+    'IdTipoUsuario__TipoUsuario', 'IdEstado__Estado',
+)
+
+
+class ProductoFastSerializer(FastSerializer):
+    model = Producto
+
+    def rows(self, pks):
+        return {
+            row[0]: _producto(*row)
+            for row in Producto.objects.filter(pk__in=pks).values_list(*_PRODUCTO_COLUMNS)
+        }
+
+
+class UsuarioFastSerializer(FastSerializer):
+    model = Usuario
+
+    def rows(self, pks):
+        return {
+            row[0]: _usuario(*row)
+            for row in Usuario.objects.filter(pk__in=pks).values_list(*_USUARIO_COLUMNS)
+        }
+
+
+class OrdenFastSerializer(FastSerializer):
+    model = Orden
+    key_fields = ('IdOrden', 'IdEstado', 'FechaCreacion', 'Version')
+
+    def rows(self, pks):
+        lineas = {}
+        for row in ProductoOrden.objects.filter(IdOrden__in=pks).order_by('id').values_list(
+            'IdOrden', 'Cantidad', 'Notas', *('IdProducto__' + column for column in _PRODUCTO_COLUMNS)
+        ):
+            IdOrden, Cantidad, Notas = row[:3]
+            lineas.setdefault(IdOrden, []).append({
+                'IdProducto': row[3],
+                'IdOrden': IdOrden,
+                'Cantidad': Cantidad,
+                'Notas': Notas,
+                'Producto': _producto(*row[3:]),
+            })
+
+        rows = {}
+        for row in Orden.objects.filter(pk__in=pks).values_list(
+            'IdOrden', 'IdUsuario', 'IdMesa', 'IdEstado', 'FechaCreacion', 'Version',
+            'IdMesa__Mesa', 'IdEstado__Estado',
+            *('IdUsuario__' + column for column in _USUARIO_COLUMNS)
+        ):
+            IdOrden, IdUsuario, IdMesa, IdEstado, FechaCreacion, Version, Mesa, Estado = row[:8]
+            rows[IdOrden] = {
+                'IdOrden': IdOrden,
+                'IdUsuario': IdUsuario,
+                'IdMesa': IdMesa,
+                'IdEstado': IdEstado,
+                'FechaCreacion': _fecha_field.to_representation(FechaCreacion),
+                'Version': Version,
+                'Usuario': _usuario(*row[8:]),
+                'Mesa': {'IdMesa': IdMesa, 'Mesa': Mesa},
+                'Estado': {'IdEstado': IdEstado, 'Estado': Estado},
+                'ProductosOrden': lineas.get(IdOrden, []),
+            }
+        return rows
@@ -0,0 +1,146 @@
+"""
+Chequeo de disponibilidad (readiness) para el balanceador de carga.
+
+Verifica la conexión a la base de datos, que no haya migraciones pendientes y
+que las cachés de catálogos estén cargadas (si no, las carga). Cada chequeo
+corre en su propio hilo con un límite de ``HEALTH_CHECK_TIMEOUT`` segundos, y
+el resultado se reutiliza durante ``HEALTH_READY_TTL`` segundos para que los
+sondeos frecuentes no lleguen a la base de datos.
+
+Un chequeo que no respondió no se vuelve a lanzar mientras su hilo siga
+corriendo (se reporta como fallido), así una consulta colgada no acumula
+hilos; la consulta a la base de datos además lleva ``statement_timeout`` en
+PostgreSQL.
+"""
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.recorder import MigrationRecorder
+
+from .cache import catalogs, usuarios_activos
+
+
+def _timeout():
+    return getattr(settings, 'HEALTH_CHECK_TIMEOUT', 2)
+
+
+def _check_db():
+    try:
+        # SET LOCAL dura solo esta transacción: con DB_POOL_MAX_SIZE la conexión
+        # vuelve al pool y la siguiente petición no debe heredar el límite
+        with transaction.atomic(), connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SET LOCAL statement_timeout = %s', [int(_timeout() * 1000)])
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+    finally:
+        # La conexión es del hilo del chequeo; no dejarla abierta
+        connection.close()
+    return {}
+
+
+# Las migraciones en disco no cambian con el proceso en ejecución: el grafo se
+# carga una vez y cada chequeo solo lee las aplicadas, hasta que no falte ninguna.
+_migraciones = None
+_migraciones_aplicadas = False
+
+
+def _check_migraciones():
+    global _migraciones, _migraciones_aplicadas
+    if _migraciones_aplicadas:
+        return {}
+    if _migraciones is None:
+        _migraciones = set(MigrationLoader(None, ignore_no_migrations=True).graph.nodes)
+    try:
+        aplicadas = set(MigrationRecorder(connection).applied_migrations())
+    finally:
+        connection.close()
+    pendientes = sorted(f'{app}.{name}' for app, name in _migraciones - aplicadas)
+    if pendientes:
+        raise RuntimeError(f"Migraciones pendientes: {', '.join(pendientes)}")
+    _migraciones_aplicadas = True
+    return {}
+
+
+def _check_cache():
+    # Cargar los catálogos aquí evita que las primeras peticiones reales paguen la carga
+    caches = {cache.model._meta.db_table: cache for cache in (*catalogs.values(), usuarios_activos)}
+    frias = [name for name, cache in caches.items() if not cache.is_warm()]
+    try:
+        for name in frias:
+            caches[name].all()
+    finally:
+        connection.close()
+    return {'cargadas': frias}
+
+
+CHECKS = {
+    'db': _check_db,
+    'migraciones': _check_migraciones,
+    'cache': _check_cache,
+}
+
+_lock = threading.Lock()
+_resultado = None
+_expira = 0.0
+# Chequeos cuyo hilo sigue corriendo: nombre -> Future
+_en_curso = {}
+
+
+def _lanzar(name, check):
+    """Corre el chequeo en un hilo nuevo, o retorna el que sigue corriendo de antes."""
+    future = _en_curso.get(name)
+    if future is not None and not future.done():
+        return future, False
+    future = Future()
+
+    def correr():
+        try:
+            future.set_result(check())
+        except Exception as error:
+            future.set_exception(error)
+
+    threading.Thread(target=correr, name=f'health-{name}', daemon=True).start()
+    _en_curso[name] = future
+    return future, True
+
+
+def _ejecutar():
+    timeout = _timeout()
+    inicio = time.monotonic()
+    futures = {name: _lanzar(name, check) for name, check in CHECKS.items()}
+
+    checks = {}
+    for name, (future, nuevo) in futures.items():
+        if not nuevo:
+            checks[name] = {'ok': False, 'error': 'El chequeo anterior sigue sin responder'}
+            continue
+        restante = max(0.0, inicio + timeout - time.monotonic())
+        try:
+            checks[name] = {'ok': True, **future.result(timeout=restante)}
+        except TimeoutError:
+            checks[name] = {'ok': False, 'error': f'Sin respuesta en {timeout}s'}
+        except Exception as error:
+            checks[name] = {'ok': False, 'error': str(error)}
+
+    return {
+        'status': 'ready' if all(check['ok'] for check in checks.values()) else 'not_ready',
+        'checks': checks,
+        'duracion_ms': round((time.monotonic() - inicio) * 1000, 2),
+    }
+
+
+def readiness():
+    """Retorna ``(listo, resultado)``; el resultado se reutiliza durante ``HEALTH_READY_TTL``."""
+    global _resultado, _expira
+    if _resultado is None or time.monotonic() >= _expira:
+        # Un solo hilo ejecuta los chequeos; los demás esperan y usan su resultado
+        with _lock:
+            if _resultado is None or time.monotonic() >= _expira:
+                _resultado = _ejecutar()
+                _expira = time.monotonic() + getattr(settings, 'HEALTH_READY_TTL', 5)
+    return _resultado['status'] == 'ready', _resultado
@@ -0,0 +1,179 @@
+"""
+Claves de idempotencia para crear órdenes (cabecera ``Idempotency-Key``).
+
+La primera petición con una clave crea la orden y guarda la respuesta 201 en
+``orden_idempotencia`` en la misma transacción; un reintento con la misma
+clave (por usuario) recibe esa respuesta sin volver a insertar nada. Las claves
+recientes se guardan además en un LRU en memoria, así la mayoría de los
+reintentos no consultan la base de datos. Las claves vencen a los
+``IDEMPOTENCY_KEY_TTL`` segundos (``python manage.py prune_idempotencia``).
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import OrdenIdempotencia
+
+
+MAX_CLAVE = 255
+
+
+class Registro:
+    __slots__ = ('huella', 'respuesta', 'expira')
+
+    def __init__(self, huella, respuesta, expira):
+        self.huella = huella
+        self.respuesta = respuesta
+        self.expira = expira
+
+
+class ClavesRecientes:
+    """LRU de ``(IdUsuario, clave) -> Registro`` con a lo más ``max_entries`` claves."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._registros = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            registro = self._registros.get(key)
+            if registro is None:
+                self.misses += 1
+                return None
+            self._registros.move_to_end(key)
+        self.hits += 1
+        return registro
+
+    def put(self, key, registro):
+        with self._lock:
+            self._registros[key] = registro
+            self._registros.move_to_end(key)
+            while len(self._registros) > self.max_entries:
+                self._registros.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._registros.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'size': len(self._registros),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else None,
+        }
+
+
+recientes = ClavesRecientes(getattr(settings, 'IDEMPOTENCY_CACHE_SIZE', 1000))
+
+
+def huella(data):
+    """sha256 del cuerpo de la petición con las llaves ordenadas."""
+    cuerpo = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder, separators=(',', ':'))
+    return hashlib.sha256(cuerpo.encode()).hexdigest()
+
+
+def buscar(id_usuario, clave):
+    """Retorna el ``Registro`` vigente de la clave (del LRU o de la tabla) o None."""
+    ahora = timezone.now()
+    registro = recientes.get((id_usuario, clave))
+    if registro is not None and registro.expira > ahora:
+        return registro
+    fila = OrdenIdempotencia.objects.filter(
+        IdUsuario=id_usuario, Clave=clave, Expira__gt=ahora
+    ).values_list('Huella', 'Respuesta', 'Expira').first()
+    if fila is None:
+        return None
+    registro = Registro(*fila)
+    recientes.put((id_usuario, clave), registro)
+    return registro
+
+
+def buscar_varias(id_usuario, claves):
+    """Como ``buscar`` para varias claves, con una sola consulta para las que no están en el LRU."""
+    ahora = timezone.now()
+    registros = {}
+    faltantes = []
+    for clave in claves:
+        registro = recientes.get((id_usuario, clave))
+        if registro is not None and registro.expira > ahora:
+            registros[clave] = registro
+        else:
+            faltantes.append(clave)
+    if faltantes:
+        for clave, *fila in OrdenIdempotencia.objects.filter(
+            IdUsuario=id_usuario, Clave__in=faltantes, Expira__gt=ahora
+        ).values_list('Clave', 'Huella', 'Respuesta', 'Expira'):
+            registros[clave] = Registro(*fila)
+            recientes.put((id_usuario, clave), registros[clave])
+    return registros
+
+
+def guardar(id_usuario, clave, huella_peticion, id_orden, respuesta):
+    """
+    Guarda la respuesta dentro de la transacción que creó la orden. Lanza
+    ``IntegrityError`` si otra petición ya guardó la misma clave vigente.
+    """
+    expira = timezone.now() + timedelta(seconds=getattr(settings, 'IDEMPOTENCY_KEY_TTL', 86400))
+    fila = OrdenIdempotencia(
+        IdUsuario_id=id_usuario, Clave=clave, Huella=huella_peticion,
+        IdOrden=id_orden, Respuesta=respuesta, Expira=expira,
+    )
+    try:
+        with transaction.atomic():
+            fila.save(force_insert=True)
+    except IntegrityError:
+        # Una clave vencida que aún no se ha purgado se puede reutilizar
+        if not OrdenIdempotencia.objects.filter(
+            IdUsuario=id_usuario, Clave=clave, Expira__lte=timezone.now()
+        ).delete()[0]:
+            raise
+        fila.save(force_insert=True)
+    registro = Registro(huella_peticion, respuesta, expira)
+    transaction.on_commit(lambda: recientes.put((id_usuario, clave), registro))
+
+
+def guardar_varias(id_usuario, respuestas):
+    """
+    Como ``guardar`` para ``[(clave, huella, IdOrden, respuesta)]`` con un
+    ``bulk_create``. Lanza ``IntegrityError`` si alguna clave vigente ya existe.
+    """
+    if not respuestas:
+        return
+    ahora = timezone.now()
+    expira = ahora + timedelta(seconds=getattr(settings, 'IDEMPOTENCY_KEY_TTL', 86400))
+    OrdenIdempotencia.objects.filter(
+        IdUsuario=id_usuario, Clave__in=[clave for clave, _, _, _ in respuestas], Expira__lte=ahora
+    ).delete()
+    OrdenIdempotencia.objects.bulk_create([
+        OrdenIdempotencia(
+            IdUsuario_id=id_usuario, Clave=clave, Huella=huella_peticion,
+            IdOrden=id_orden, Respuesta=respuesta, Expira=expira,
+        )
+        for clave, huella_peticion, id_orden, respuesta in respuestas
+    ])
+    registros = {
+        clave: Registro(huella_peticion, respuesta, expira) for clave, huella_peticion, _, respuesta in respuestas
+    }
+
+    def _recordar():
+        for clave, registro in registros.items():
+            recientes.put((id_usuario, clave), registro)
+    transaction.on_commit(_recordar)
+
+
+def prune_vencidas(now=None):
+    """Elimina las claves vencidas; retorna cuántas se borraron."""
+    deleted, _ = OrdenIdempotencia.objects.filter(Expira__lt=now or timezone.now()).delete()
+    return deleted
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from api.resumenes import LOTE, actualizar_resumenes
+
+
+class Command(BaseCommand):
+    help = (
+        'Suma los cambios de estado nuevos a los resúmenes por hora y por día '
+        '(ejecutar periódicamente, p. ej. cada minuto con cron)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=LOTE, help='Cambios de estado por transacción')
+
+    def handle(self, *args, **options):
+        procesados = actualizar_resumenes(lote=options['lote'])
+        self.stdout.write(self.style.SUCCESS(f'[OK] {procesados} cambios de estado procesados'))
@@ -0,0 +1,342 @@
+import gc
+import json
+import math
+import random
+import re
+import threading
+import time
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+LOGIN = 'POST /api/auth/login/'
+MENU = 'GET /api/productos/'
+MESAS = 'GET /api/mesas/'
+ESTADOS = 'GET /api/estados/'
+CREAR_ORDEN = 'POST /api/ordenes/'
+CAMBIOS = 'GET /api/ordenes/cambios/'
+COCINA = 'GET /api/ordenes/cocina/'
+ESTADO_ORDEN = 'PATCH /api/ordenes/{id}/estado/'
+
+# Transiciones que hace la cocina sobre cada orden
+SIGUIENTE_ESTADO = {
+    'Pendiente': 'En Preparación',
+    'En Preparación': 'Listo',
+    'Listo': 'Entregado',
+}
+
+
+# Cantidad de consultas que reporta RequestMetricsMiddleware: db;desc="5";dur=3.10
+SERVER_TIMING_DB = re.compile(r'(?:^|,)\s*db;desc="(\d+)"')
+
+
+def _queries_from_server_timing(headers):
+    match = SERVER_TIMING_DB.search(headers.get('Server-Timing', ''))
+    return int(match.group(1)) if match else None
+
+
+class HttpTransport:
+    """Envía las peticiones a un servidor en ejecución; las consultas SQL se leen de Server-Timing."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, path, body=None, headers=None):
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        request = Request(self.base_url + path, data=data, method=method)
+        request.add_header('Content-Type', 'application/json')
+        for name, value in (headers or {}).items():
+            request.add_header(name, value)
+        try:
+            with urlopen(request) as response:
+                headers = dict(response.headers)
+                return response.status, response.read(), headers, _queries_from_server_timing(headers)
+        except HTTPError as error:
+            headers = dict(error.headers)
+            return error.code, error.read(), headers, _queries_from_server_timing(headers)
+
+
+class InProcessTransport:
+    """Ejecuta las peticiones con el cliente de pruebas de Django y cuenta las consultas SQL."""
+
+    def __init__(self):
+        from django.db import connection
+        from django.test import Client
+        self.client = Client()
+        self.connection = connection
+
+    def request(self, method, path, body=None, headers=None):
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(self.connection) as queries:
+            response = self.client.generic(
+                method, path,
+                data=json.dumps(body) if body is not None else '',
+                content_type='application/json',
+                headers=headers or {},
+            )
+        return response.status_code, response.content, dict(response.headers), len(queries)
+
+
+class Stats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}
+        self.queries = {}
+        self.errors = {}
+
+    def record(self, name, elapsed, queries, ok):
+        with self._lock:
+            self.latencies.setdefault(name, []).append(elapsed * 1000)
+            if queries is not None:
+                self.queries[name] = max(self.queries.get(name, 0), queries)
+            if not ok:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+    def report(self, duration):
+        report = {}
+        for name, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            report[name] = {
+                'count': len(values),
+                'errors': self.errors.get(name, 0),
+                'rps': round(len(values) / duration, 2) if duration else None,
+                'p50': round(_percentile(values, 50), 2),
+                'p95': round(_percentile(values, 95), 2),
+                'p99': round(_percentile(values, 99), 2),
+                'queries': self.queries.get(name),
+            }
+        return report
+
+
+def _percentile(values, percent):
+    # Nearest-rank sobre una lista ordenada
+    return values[max(0, math.ceil(percent / 100 * len(values)) - 1)]
+
+
+class StaffClient:
+    """Un usuario del restaurante (mesero o cocina) con su propio token y generador aleatorio."""
+
+    def __init__(self, transport, stats, username, password, seed):
+        self.transport = transport
+        self.stats = stats
+        self.username = username
+        self.password = password
+        self.random = random.Random(seed)
+        self.token = None
+        self.usuario = None
+
+    def call(self, name, method, path, body=None, headers=None, expected=(200,)):
+        headers = dict(headers or {})
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        start = time.perf_counter()
+        status, content, response_headers, queries = self.transport.request(method, path, body, headers)
+        elapsed = time.perf_counter() - start
+        ok = status in expected
+        self.stats.record(name, elapsed, queries, ok)
+        if not ok:
+            raise CommandError(f'{name} respondió {status}: {content[:200]!r}')
+        data = json.loads(content) if content else None
+        return data, response_headers
+
+    def login(self):
+        data, _ = self.call(LOGIN, 'POST', '/api/auth/login/', {
+            'username': self.username, 'password': self.password,
+        })
+        self.token = data['token']
+        self.usuario = data['usuario']
+        estados, _ = self.call(ESTADOS, 'GET', '/api/estados/')
+        self.estados = {estado['Estado']: estado['IdEstado'] for estado in estados['results']}
+        self.nombres_estado = {id_estado: nombre for nombre, id_estado in self.estados.items()}
+
+
+class WaiterClient(StaffClient):
+    def login(self):
+        super().login()
+        self.etag = None
+        self.cursor = 0
+        self.leer_menu()
+        mesas, _ = self.call(MESAS, 'GET', '/api/mesas/')
+        self.mesas = [mesa['IdMesa'] for mesa in mesas['results']]
+
+    def leer_menu(self):
+        # Las tablets recargan el menú constantemente con un GET condicional
+        headers = {'If-None-Match': self.etag} if self.etag else {}
+        data, response_headers = self.call(MENU, 'GET', '/api/productos/', headers=headers, expected=(200, 304))
+        if data is not None:
+            self.productos = [producto['IdProducto'] for producto in data['results']]
+        self.etag = response_headers.get('ETag', self.etag)
+
+    def step(self):
+        self.leer_menu()
+        lineas = self.random.sample(self.productos, self.random.randint(3, min(12, len(self.productos))))
+        self.call(CREAR_ORDEN, 'POST', '/api/ordenes/', {
+            'IdUsuario': self.usuario['IdUsuario'],
+            'IdMesa': self.random.choice(self.mesas),
+            'IdEstado': self.estados['Pendiente'],
+            'Productos': [
+                {
+                    'IdProducto': id_producto,
+                    'Cantidad': self.random.randint(1, 3),
+                    'Notas': 'Sin cebolla' if self.random.random() < 0.1 else None,
+                }
+                for id_producto in lineas
+            ],
+        }, expected=(201,))
+        data, _ = self.call(CAMBIOS, 'GET', f'/api/ordenes/cambios/?since={self.cursor}')
+        self.cursor = data['cursor']
+
+
+class KitchenClient(StaffClient):
+    def __init__(self, *args, batch=3, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batch = batch
+
+    def step(self):
+        cola, _ = self.call(COCINA, 'GET', '/api/ordenes/cocina/')
+        for orden in cola[:self.batch]:
+            siguiente = SIGUIENTE_ESTADO.get(self.nombres_estado.get(orden['IdEstado']))
+            if siguiente is None:
+                continue
+            self.call(ESTADO_ORDEN, 'PATCH', f"/api/ordenes/{orden['IdOrden']}/estado/", {
+                'IdEstado': self.estados[siguiente],
+            })
+
+
+class Command(BaseCommand):
+    help = (
+        'Simula un servicio de cena sobre la API (logins, menú, órdenes, cocina) y reporta '
+        'latencia p50/p95/p99, throughput y consultas SQL por endpoint'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help='Servidor a probar (p. ej. http://localhost:8000). '
+                                          'Sin --url se ejecuta en proceso sobre una base de datos de prueba.')
+        parser.add_argument('--ticks', type=int, default=50, help='Rondas de la simulación')
+        parser.add_argument('--waiters', type=int, default=2, help='Meseros simulados')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--baseline', help='Archivo JSON de línea base para comparar')
+        parser.add_argument('--save-baseline', help='Guarda los resultados como línea base en este archivo')
+        parser.add_argument('--check-latency', action='store_true',
+                            help='Compara también el p95 con la línea base; solo tiene sentido si se '
+                                 'guardó en la misma máquina')
+        parser.add_argument('--tolerance', type=float, default=0.5,
+                            help='Aumento relativo de p95 permitido con --check-latency')
+        parser.add_argument('--json', dest='json_output', help='Guarda el reporte completo en este archivo')
+
+    def handle(self, *args, **options):
+        if options['url']:
+            report = self.run(HttpTransport(options['url']), options, threaded=True)
+        else:
+            report = self.run_in_process(options)
+
+        self.print_report(report)
+
+        if options['json_output']:
+            with open(options['json_output'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, indent=2, ensure_ascii=False)
+        if options['save_baseline']:
+            with open(options['save_baseline'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, indent=2, ensure_ascii=False)
+                output.write('\n')
+            self.stdout.write(self.style.SUCCESS(f"[OK] Línea base guardada en {options['save_baseline']}"))
+        if options['baseline']:
+            tolerance = options['tolerance'] if options['check_latency'] else None
+            self.check_baseline(report, options['baseline'], tolerance)
+
+    def run_in_process(self, options):
+        # Base de datos desechable con las migraciones (incluyen los datos iniciales)
+        from django.test.runner import DiscoverRunner
+        from django.test.utils import setup_test_environment, teardown_test_environment
+
+        setup_test_environment()
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        old_config = runner.setup_databases()
+        try:
+            return self.run(InProcessTransport(), options, threaded=False)
+        finally:
+            runner.teardown_databases(old_config)
+            teardown_test_environment()
+
+    def run(self, transport, options, threaded):
+        stats = Stats()
+        seed = options['seed']
+        meseros = [('maria', 'mesero123'), ('carlos', 'mesero123')]
+        clients = [
+            WaiterClient(transport, stats, *meseros[index % len(meseros)], seed=seed + index)
+            for index in range(options['waiters'])
+        ]
+        clients.append(KitchenClient(transport, stats, 'cocina', 'cocina123', seed=seed - 1))
+
+        # Una recolección completa durante las primeras peticiones (p. ej. después
+        # de aplicar las migraciones) aparece como un pico en endpoints con pocas muestras
+        gc.collect()
+        start = time.perf_counter()
+        for client in clients:
+            client.login()
+
+        if threaded:
+            errors = []
+
+            def worker(client):
+                try:
+                    for _ in range(options['ticks']):
+                        client.step()
+                except CommandError as error:
+                    errors.append(error)
+
+            threads = [threading.Thread(target=worker, args=(client,)) for client in clients]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            if errors:
+                raise errors[0]
+        else:
+            # En proceso las rondas se intercalan siempre igual: resultados reproducibles
+            for _ in range(options['ticks']):
+                for client in clients:
+                    client.step()
+
+        return stats.report(time.perf_counter() - start)
+
+    def print_report(self, report):
+        header = f"{'endpoint':<34} {'n':>6} {'err':>4} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'sql':>5}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for name, row in report.items():
+            queries = '-' if row['queries'] is None else row['queries']
+            self.stdout.write(
+                f"{name:<34} {row['count']:>6} {row['errors']:>4} {row['rps']:>8} "
+                f"{row['p50']:>8} {row['p95']:>8} {row['p99']:>8} {queries:>5}"
+            )
+
+    def check_baseline(self, report, path, tolerance=None):
+        # Las consultas SQL son deterministas y se comparan siempre; las latencias
+        # dependen de la máquina y solo se comparan si se pasa ``tolerance``
+        with open(path, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+
+        regressions = []
+        for name, base in baseline.items():
+            current = report.get(name)
+            if current is None:
+                regressions.append(f'{name}: no se ejecutó')
+                continue
+            if base.get('queries') is not None and current['queries'] is not None \
+                    and current['queries'] > base['queries']:
+                regressions.append(f"{name}: {current['queries']} consultas SQL (línea base {base['queries']})")
+            if tolerance is None:
+                continue
+            # Se ignoran variaciones de pocos milisegundos, que son ruido de la máquina
+            limit = max(base['p95'] * (1 + tolerance), base['p95'] + 5)
+            if current['p95'] > limit:
+                regressions.append(f"{name}: p95 {current['p95']} ms (línea base {base['p95']} ms)")
+
+        if regressions:
+            for regression in regressions:
+                self.stderr.write(regression)
+            raise CommandError('Regresión de rendimiento respecto a la línea base')
+        self.stdout.write(self.style.SUCCESS('[OK] Sin regresiones respecto a la línea base'))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from api.idempotencia import prune_vencidas
+
+
+class Command(BaseCommand):
+    help = 'Elimina las claves de idempotencia de órdenes que ya vencieron (ejecutar periódicamente, p. ej. con cron)'
+
+    def handle(self, *args, **options):
+        eliminadas = prune_vencidas()
+        self.stdout.write(self.style.SUCCESS(f'[OK] {eliminadas} claves de idempotencia eliminadas'))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from api.tokens import prune_revocados
+
+
+class Command(BaseCommand):
+    help = 'Elimina los tokens revocados que ya expiraron (ejecutar periódicamente, p. ej. con cron)'
+
+    def handle(self, *args, **options):
+        eliminados = prune_revocados()
+        self.stdout.write(self.style.SUCCESS(f'[OK] {eliminados} tokens revocados eliminados'))
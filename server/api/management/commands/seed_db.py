@@ -1,13 +1,45 @@
 from django.core.management.base import BaseCommand
-from datetime import datetime, timedelta
+from django.db import transaction
+from django.utils import timezone
+from datetime import date, datetime, timedelta
+import random
+import time
 from api.models import (
     Estado, TipoProducto, TipoUsuario, Persona,
-    Producto, Usuario, Mesa, Orden, ProductoOrden
+    Producto, Usuario, Mesa, Orden, ProductoOrden, OrdenEliminada, OrdenEstadoHistorial,
+    ResumenDia, ResumenHora, Secuencia
 )
+from api.resumenes import actualizar_resumenes
+
+
+# Órdenes relativas por hora del día (almuerzo y cena) y por día de la semana (lunes = 0)
+PESO_HORA = {11: 3, 12: 10, 13: 12, 14: 8, 15: 3, 16: 2, 17: 3, 18: 6, 19: 11, 20: 13, 21: 10, 22: 5, 23: 2}
+PESO_DIA = [0.7, 0.75, 0.85, 1.0, 1.4, 1.5, 1.1]
+# Cantidad de productos distintos por orden (1 a 8) y unidades por producto (1 a 4)
+PESO_LINEAS = [10, 20, 25, 18, 12, 8, 4, 3]
+PESO_CANTIDAD = [70, 20, 7, 3]
+NOTAS = ['Sin cebolla', 'Sin sal', 'Bien cocido', 'Término medio', 'Sin hielo', 'Para llevar']
+PROBABILIDAD_NOTAS = 0.05
+PROBABILIDAD_CANCELADA = 0.04
+# Último día del historial si no se indica --end-date: fijo para que la misma
+# semilla genere las mismas filas sin importar el día en que se ejecute.
+FECHA_FIN = date(2026, 10, 17)
 
 
 class Command(BaseCommand):
-    help = 'Pobla la base de datos con datos iniciales'
+    help = 'Pobla la base de datos con datos iniciales y, opcionalmente, con historial sintético de órdenes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=0,
+                            help='Días de historial de órdenes a generar, terminando en --end-date')
+        parser.add_argument('--end-date', type=date.fromisoformat, default=FECHA_FIN,
+                            help=f'Último día del historial, AAAA-MM-DD (por defecto {FECHA_FIN.isoformat()})')
+        parser.add_argument('--orders-per-day', type=int, default=300,
+                            help='Órdenes promedio por día (varía según el día de la semana)')
+        parser.add_argument('--seed', type=int, default=42,
+                            help='Semilla del generador; la misma semilla produce los mismos datos')
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Órdenes por transacción y por bulk_create')
 
     def handle(self, *args, **options):
         self.stdout.write('Iniciando seed de la base de datos...')
@@ -15,6 +47,10 @@ class Command(BaseCommand):
         # Limpiar datos existentes
         ProductoOrden.objects.all().delete()
         Orden.objects.all().delete()
+        OrdenEliminada.objects.all().delete()
+        ResumenHora.objects.all().delete()
+        ResumenDia.objects.all().delete()
+        Secuencia.objects.all().delete()
         Usuario.objects.all().delete()
         Persona.objects.all().delete()
         Producto.objects.all().delete()
@@ -138,18 +174,21 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS('[OK] Productos creados'))
 
         # Crear Órdenes de ejemplo
-        fecha1 = datetime.now() - timedelta(minutes=15)
-        fecha2 = datetime.now() - timedelta(minutes=5)
-        fecha3 = datetime.now() - timedelta(minutes=25)
+        fecha1 = timezone.now() - timedelta(minutes=15)
+        fecha2 = timezone.now() - timedelta(minutes=5)
+        fecha3 = timezone.now() - timedelta(minutes=25)
 
         ordenes_data = [
             {'IdUsuario': usuarios[2], 'IdMesa': mesas[4], 'IdEstado': estados['En Preparación'], 'FechaCreacion': fecha1},
             {'IdUsuario': usuarios[1], 'IdMesa': mesas[2], 'IdEstado': estados['Pendiente'], 'FechaCreacion': fecha2},
             {'IdUsuario': usuarios[2], 'IdMesa': mesas[7], 'IdEstado': estados['Listo'], 'FechaCreacion': fecha3},
         ]
+        if options['days'] > 0:
+            self.generar_historial(options, usuarios, mesas, productos, estados)
+
         ordenes = []
         for orden_data in ordenes_data:
-            orden = Orden.objects.create(**orden_data)
+            orden = Orden.objects.create(Version=Orden.siguiente_version(), **orden_data)
             ordenes.append(orden)
         self.stdout.write(self.style.SUCCESS('[OK] Ordenes creadas'))
 
@@ -172,3 +211,117 @@ class Command(BaseCommand):
         self.stdout.write('   - carlos / mesero123 (Mesero)')
         self.stdout.write('   - cocina / cocina123 (Cocina)')
 
+    def generar_historial(self, options, usuarios, mesas, productos, estados):
+        """
+        Genera ``--days`` días de órdenes ya cerradas (Entregado o Cancelado),
+        con su historial de estados, en transacciones de ``--batch-size``
+        órdenes; al final calcula los resúmenes por hora y por día.
+        """
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+        meseros = [usuario for usuario in usuarios if usuario.IdTipoUsuario.TipoUsuario == 'Mesero']
+        horas = list(PESO_HORA)
+        peso_horas = list(PESO_HORA.values())
+
+        # Popularidad tipo Zipf: pocos productos concentran la mayoría de las ventas
+        ranking = productos[:]
+        rng.shuffle(ranking)
+        peso_productos = [1 / (posicion + 1) ** 0.8 for posicion in range(len(ranking))]
+        # Minutos de preparación de cada producto; la orden tarda lo que su producto más lento
+        minutos_preparacion = {producto.IdProducto: rng.randint(5, 25) for producto in ranking}
+        max_lineas = min(len(PESO_LINEAS), len(ranking))
+
+        fin = timezone.make_aware(datetime.combine(options['end_date'], datetime.min.time()))
+        version = Orden.version_actual()
+        total_ordenes = 0
+        total_lineas = 0
+        inicio = time.monotonic()
+        pendientes = []
+
+        def guardar(pendientes):
+            with transaction.atomic():
+                ordenes = Orden.objects.bulk_create(
+                    [orden for orden, _, _ in pendientes], batch_size=batch_size
+                )
+                lineas = []
+                for orden, productos_orden in zip(ordenes, (lineas for _, lineas, _ in pendientes)):
+                    for producto, cantidad, notas in productos_orden:
+                        lineas.append(ProductoOrden(
+                            IdProducto=producto, IdOrden=orden, Cantidad=cantidad, Notas=notas
+                        ))
+                ProductoOrden.objects.bulk_create(lineas, batch_size=batch_size)
+                OrdenEstadoHistorial.objects.bulk_create([
+                    OrdenEstadoHistorial(
+                        IdOrden=orden, IdEstadoAnterior=estados[anterior], IdEstado=estados[siguiente],
+                        Fecha=fecha, Segundos=(fecha - desde).total_seconds(), Version=orden.Version,
+                    )
+                    for orden, cambios in zip(ordenes, (cambios for _, _, cambios in pendientes))
+                    for anterior, siguiente, desde, fecha in cambios
+                ], batch_size=batch_size)
+            return len(lineas)
+
+        for dias_atras in range(options['days'] - 1, -1, -1):
+            dia = fin - timedelta(days=dias_atras)
+            cantidad_dia = round(options['orders_per_day'] * PESO_DIA[dia.weekday()])
+            fechas = sorted(
+                dia + timedelta(hours=hora, seconds=rng.randrange(3600))
+                for hora in rng.choices(horas, weights=peso_horas, k=cantidad_dia)
+            )
+            for fecha in fechas:
+                version += 1
+                cancelada = rng.random() < PROBABILIDAD_CANCELADA
+                orden = Orden(
+                    IdUsuario=rng.choice(meseros),
+                    IdMesa=rng.choice(mesas),
+                    IdEstado=estados['Cancelado' if cancelada else 'Entregado'],
+                    FechaCreacion=fecha,
+                    Version=version,
+                )
+                numero_lineas = rng.choices(range(1, max_lineas + 1), weights=PESO_LINEAS[:max_lineas])[0]
+                elegidos = set()
+                while len(elegidos) < numero_lineas:
+                    elegidos.add(rng.choices(range(len(ranking)), weights=peso_productos)[0])
+                lineas = [
+                    (
+                        ranking[indice],
+                        rng.choices((1, 2, 3, 4), weights=PESO_CANTIDAD)[0],
+                        rng.choice(NOTAS) if rng.random() < PROBABILIDAD_NOTAS else None,
+                    )
+                    for indice in sorted(elegidos)
+                ]
+
+                # (estado anterior, estado siguiente, desde, fecha del cambio)
+                if cancelada:
+                    cancelacion = fecha + timedelta(minutes=rng.randint(2, 20))
+                    cambios = [('Pendiente', 'Cancelado', fecha, cancelacion)]
+                else:
+                    preparacion = fecha + timedelta(minutes=rng.randint(1, 8))
+                    listo = preparacion + timedelta(minutes=max(
+                        minutos_preparacion[producto.IdProducto] for producto, _, _ in lineas
+                    ) + rng.randint(0, 8))
+                    entrega = listo + timedelta(minutes=rng.randint(1, 10))
+                    cambios = [
+                        ('Pendiente', 'En Preparación', fecha, preparacion),
+                        ('En Preparación', 'Listo', preparacion, listo),
+                        ('Listo', 'Entregado', listo, entrega),
+                    ]
+                orden.FechaEstado = cambios[-1][3]
+                pendientes.append((orden, lineas, cambios))
+
+                if len(pendientes) >= batch_size:
+                    total_lineas += guardar(pendientes)
+                    total_ordenes += len(pendientes)
+                    pendientes = []
+                    self.stdout.write(f'   {total_ordenes} órdenes ({time.monotonic() - inicio:.0f}s)')
+
+        if pendientes:
+            total_lineas += guardar(pendientes)
+            total_ordenes += len(pendientes)
+
+        Secuencia.objects.update_or_create(Nombre='orden', defaults={'Valor': version})
+        self.stdout.write(self.style.SUCCESS(
+            f'[OK] Historial generado: {total_ordenes} órdenes y {total_lineas} productos de órdenes '
+            f'en {time.monotonic() - inicio:.1f}s'
+        ))
+        procesados = actualizar_resumenes()
+        self.stdout.write(self.style.SUCCESS(f'[OK] Resúmenes calculados ({procesados} cambios de estado)'))
@@ -0,0 +1,247 @@
+"""
+Métricas en memoria por ruta (acción de viewset): cantidad de peticiones,
+consultas SQL y tiempos, con histogramas de buckets fijos; además contadores
+del negocio (órdenes, tiempo en cada estado, logins, bcrypt) que se exponen
+junto con los de la caché en formato de texto de Prometheus (``/metrics``).
+
+Los contadores se actualizan sin lock, igual que las estadísticas de
+``api.cache``: con varios hilos se puede perder un incremento ocasional, lo
+que es aceptable para métricas y evita serializar las peticiones. Cada
+proceso lleva sus propias métricas.
+"""
+import math
+
+
+# Límites superiores (inclusive) de los buckets; el último es +Inf.
+DURACION_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, math.inf)
+CONSULTAS_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, math.inf)
+BCRYPT_BUCKETS_S = (0.05, 0.1, 0.2, 0.3, 0.5, 1, 2, math.inf)
+TIEMPO_ESTADO_BUCKETS_S = (30, 60, 120, 300, 600, 900, 1200, 1800, 3600, 7200, math.inf)
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        for index, limit in enumerate(self.buckets):
+            if value <= limit:
+                self.counts[index] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self):
+        """Buckets acumulados (``le``) como en Prometheus."""
+        acumulado = 0
+        buckets = {}
+        for limit, count in zip(self.buckets, self.counts):
+            acumulado += count
+            buckets['+Inf' if limit == math.inf else str(limit)] = acumulado
+        return {'count': self.count, 'sum': round(self.sum, 3), 'buckets': buckets}
+
+
+class Counter:
+    """Contador con etiquetas: ``inc('a', 'b')`` suma en la serie ``('a', 'b')``."""
+    __slots__ = ('values',)
+
+    def __init__(self):
+        self.values = {}
+
+    def inc(self, *labels):
+        self.values[labels] = self.values.get(labels, 0) + 1
+
+
+class LabeledHistogram:
+    __slots__ = ('buckets', 'series')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, value, *labels):
+        histogram = self.series.get(labels)
+        if histogram is None:
+            histogram = self.series.setdefault(labels, Histogram(self.buckets))
+        histogram.observe(value)
+
+
+class RouteMetrics:
+    __slots__ = ('count', 'errors', 'max_queries', 'total', 'db', 'app', 'consultas')
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.max_queries = 0
+        self.total = Histogram(DURACION_BUCKETS_MS)
+        self.db = Histogram(DURACION_BUCKETS_MS)
+        self.app = Histogram(DURACION_BUCKETS_MS)
+        self.consultas = Histogram(CONSULTAS_BUCKETS)
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'max_queries': self.max_queries,
+            'avg_queries': round(self.consultas.sum / self.count, 2) if self.count else None,
+            'total_ms': self.total.snapshot(),
+            'db_ms': self.db.snapshot(),
+            'app_ms': self.app.snapshot(),
+            'consultas': self.consultas.snapshot(),
+        }
+
+
+_routes = {}
+
+ordenes_creadas = Counter()
+# Segundos que una orden pasó en un estado, por (estado, siguiente estado)
+tiempo_en_estado = LabeledHistogram(TIEMPO_ESTADO_BUCKETS_S)
+# Logins por resultado: ok, credenciales_invalidas, inactivo, ocupado
+logins = Counter()
+# Duración de cada hash o verificación dentro del pool, por operación (hash, check)
+bcrypt_duracion = LabeledHistogram(BCRYPT_BUCKETS_S)
+
+
+def record_cambio_estado(anterior, siguiente, desde, hasta):
+    """Registra que una orden pasó de ``desde`` a ``hasta`` en el estado ``anterior`` antes de ``siguiente``."""
+    segundos = max((hasta - desde).total_seconds(), 0)
+    tiempo_en_estado.observe(segundos, anterior.Estado, siguiente.Estado)
+
+
+def record_request(route, status_code, total_ms, db_ms, app_ms, queries):
+    metrics = _routes.get(route)
+    if metrics is None:
+        metrics = _routes.setdefault(route, RouteMetrics())
+    metrics.count += 1
+    if status_code >= 500:
+        metrics.errors += 1
+    if queries > metrics.max_queries:
+        metrics.max_queries = queries
+    metrics.total.observe(total_ms)
+    metrics.db.observe(db_ms)
+    metrics.app.observe(app_ms)
+    metrics.consultas.observe(queries)
+
+
+def routes():
+    return dict(_routes)
+
+
+def snapshot():
+    return {route: metrics.snapshot() for route, metrics in sorted(routes().items())}
+
+
+def reset():
+    _routes.clear()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Exposicion:
+    """Arma el texto en formato de exposición de Prometheus (versión 0.0.4)."""
+
+    def __init__(self):
+        self.lines = []
+
+    def header(self, name, kind, help_text):
+        self.lines.append(f'# HELP {name} {help_text}')
+        self.lines.append(f'# TYPE {name} {kind}')
+
+    def samples(self, name, label_names, values):
+        for labels, value in sorted(values.items()):
+            self.lines.append(f'{name}{_labels(label_names, labels)} {_number(value)}')
+
+    def counter(self, name, help_text, label_names, values):
+        self.header(name, 'counter', help_text)
+        self.samples(name, label_names, values)
+
+    def gauge(self, name, help_text, label_names, values):
+        self.header(name, 'gauge', help_text)
+        self.samples(name, label_names, values)
+
+    def histogram(self, name, help_text, label_names, series, scale=1):
+        """``scale`` convierte la unidad de los buckets (p. ej. 0.001 de ms a segundos)."""
+        self.header(name, 'histogram', help_text)
+        for labels, histogram in sorted(series.items()):
+            acumulado = 0
+            for limit, count in zip(histogram.buckets, histogram.counts):
+                acumulado += count
+                le = 'le="%s"' % _number(limit if limit == math.inf else round(limit * scale, 6))
+                self.lines.append(f'{name}_bucket{_labels(label_names, labels, le)} {acumulado}')
+            self.lines.append(f'{name}_sum{_labels(label_names, labels)} {_number(round(histogram.sum * scale, 6))}')
+            self.lines.append(f'{name}_count{_labels(label_names, labels)} {histogram.count}')
+
+    def text(self):
+        return '\n'.join(self.lines) + '\n'
+
+
+def prometheus(cache_stats):
+    """Texto para ``/metrics``; ``cache_stats`` es el resultado de ``api.cache.stats()``."""
+    rutas = routes()
+    exposicion = _Exposicion()
+    exposicion.counter(
+        'kitchon_http_requests_total', 'Peticiones HTTP por ruta (basename.accion).',
+        ('route',), {(route,): metrics.count for route, metrics in rutas.items()},
+    )
+    exposicion.counter(
+        'kitchon_http_errors_total', 'Respuestas 5xx por ruta.',
+        ('route',), {(route,): metrics.errors for route, metrics in rutas.items()},
+    )
+    exposicion.histogram(
+        'kitchon_http_request_duration_seconds', 'Duración total de la petición.',
+        ('route',), {(route,): metrics.total for route, metrics in rutas.items()}, scale=0.001,
+    )
+    exposicion.histogram(
+        'kitchon_http_db_duration_seconds', 'Tiempo en la base de datos por petición.',
+        ('route',), {(route,): metrics.db for route, metrics in rutas.items()}, scale=0.001,
+    )
+    exposicion.histogram(
+        'kitchon_http_sql_queries', 'Consultas SQL por petición.',
+        ('route',), {(route,): metrics.consultas for route, metrics in rutas.items()},
+    )
+    exposicion.counter(
+        'kitchon_ordenes_creadas_total', 'Órdenes creadas (rate()*60 = órdenes por minuto).',
+        (), dict(ordenes_creadas.values) or {(): 0},
+    )
+    exposicion.histogram(
+        'kitchon_orden_tiempo_en_estado_seconds', 'Tiempo que una orden pasó en un estado antes de cambiar.',
+        ('estado', 'siguiente'), dict(tiempo_en_estado.series),
+    )
+    exposicion.counter('kitchon_logins_total', 'Intentos de login por resultado.', ('resultado',), dict(logins.values))
+    exposicion.histogram(
+        'kitchon_bcrypt_duration_seconds', 'Duración de bcrypt dentro del pool de hash.',
+        ('operacion',), dict(bcrypt_duracion.series),
+    )
+    exposicion.counter(
+        'kitchon_cache_hits_total', 'Aciertos por caché.',
+        ('cache',), {(name,): data['hits'] for name, data in cache_stats.items()},
+    )
+    exposicion.counter(
+        'kitchon_cache_misses_total', 'Fallos por caché.',
+        ('cache',), {(name,): data['misses'] for name, data in cache_stats.items()},
+    )
+    exposicion.gauge(
+        'kitchon_cache_hit_ratio', 'Proporción de aciertos por caché desde el inicio del proceso.',
+        ('cache',), {(name,): data['hit_ratio'] for name, data in cache_stats.items() if data['hit_ratio'] is not None},
+    )
+    return exposicion.text()
@@ -0,0 +1,124 @@
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from . import metrics
+
+
+class _Medicion:
+    """Tiempos de una petición; también es el ``execute_wrapper`` que mide cada consulta."""
+    __slots__ = ('queries', 'db', 'inicio_vista', 'db_antes_vista', 'fin_vista', 'render', 'route')
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.inicio_vista = None
+        self.db_antes_vista = 0.0
+        self.fin_vista = None
+        self.render = 0.0
+        self.route = None
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - inicio
+            self.queries += 1
+
+
+def route_name(request, view_func):
+    """``basename.accion`` para los viewsets; nombre o patrón de la URL para el resto."""
+    actions = getattr(view_func, 'actions', None)
+    if actions is not None:
+        basename = view_func.initkwargs.get('basename') or view_func.cls.__name__
+        action = actions.get(request.method.lower(), request.method.lower())
+        return f'{basename}.{action}'
+    match = request.resolver_match
+    return match.url_name or match.route
+
+
+class RequestMetricsMiddleware:
+    """
+    Mide por petición las consultas SQL, el tiempo en la base de datos, el
+    tiempo de la aplicación y el total; los agrega por ruta en
+    ``api.metrics`` y los retorna en la cabecera ``Server-Timing``:
+
+        Server-Timing: db;desc="5";dur=3.10, app;dur=1.92, total;dur=6.40
+
+    ``db`` lleva la cantidad de consultas en ``desc``. ``app`` es el tiempo
+    de Python dentro de la vista sin contar la base de datos (serializers,
+    validación, bcrypt, etc.) más el renderizado de la respuesta.
+
+    En las respuestas por partes (``StreamingHttpResponse``) la cabecera solo
+    cubre hasta que la vista retorna; las consultas y el tiempo de generar el
+    cuerpo se suman a las métricas de la ruta al terminar de enviarlo. Se
+    activa con ``REQUEST_METRICS`` en settings.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_METRICS', False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        medicion = request._medicion = _Medicion()
+        inicio = time.perf_counter()
+        with connection.execute_wrapper(medicion):
+            response = self.get_response(request)
+        fin = time.perf_counter()
+
+        app = medicion.render
+        if medicion.inicio_vista is not None:
+            fin_vista = medicion.fin_vista or fin
+            app += max(0.0, fin_vista - medicion.inicio_vista - (medicion.db - medicion.db_antes_vista))
+
+        response['Server-Timing'] = (
+            f'db;desc="{medicion.queries}";dur={medicion.db * 1000:.2f}, '
+            f'app;dur={app * 1000:.2f}, total;dur={(fin - inicio) * 1000:.2f}'
+        )
+        if response.streaming:
+            response.streaming_content = self._medir_cuerpo(
+                response.streaming_content, response, medicion, inicio, app
+            )
+        else:
+            self._registrar(response, medicion, fin - inicio, app)
+        return response
+
+    def _medir_cuerpo(self, contenido, response, medicion, inicio, app):
+        """Envuelve el cuerpo por partes para contar sus consultas y su tiempo."""
+        db_antes = medicion.db
+        inicio_cuerpo = time.perf_counter()
+        try:
+            with connection.execute_wrapper(medicion):
+                yield from contenido
+        finally:
+            fin = time.perf_counter()
+            app += max(0.0, fin - inicio_cuerpo - (medicion.db - db_antes))
+            self._registrar(response, medicion, fin - inicio, app)
+
+    def _registrar(self, response, medicion, total, app):
+        metrics.record_request(
+            medicion.route or 'sin_ruta', response.status_code,
+            total * 1000, medicion.db * 1000, app * 1000, medicion.queries,
+        )
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        medicion = request._medicion
+        medicion.route = route_name(request, view_func)
+        medicion.inicio_vista = time.perf_counter()
+        medicion.db_antes_vista = medicion.db
+
+    def process_template_response(self, request, response):
+        # Las respuestas de DRF se renderizan después de salir de la vista
+        medicion = request._medicion
+        medicion.fin_vista = time.perf_counter()
+        db_antes = medicion.db
+
+        def medir_render(response):
+            medicion.render += time.perf_counter() - medicion.fin_vista - (medicion.db - db_antes)
+
+        response.add_post_render_callback(medir_render)
+        return response
@@ -0,0 +1,50 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:31
+
+from django.db import migrations, models
+from django.db.models import F, Max
+
+
+def backfill_version(apps, schema_editor):
+    # Las órdenes existentes reciben su Id como versión inicial
+    Orden = apps.get_model('api', 'Orden')
+    Secuencia = apps.get_model('api', 'Secuencia')
+    Orden.objects.update(Version=F('IdOrden'))
+    ultima = Orden.objects.aggregate(ultima=Max('IdOrden'))['ultima'] or 0
+    Secuencia.objects.update_or_create(Nombre='orden', defaults={'Valor': ultima})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_create_initial_data'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrdenEliminada',
+            fields=[
+                ('IdOrden', models.IntegerField(primary_key=True, serialize=False)),
+                ('Version', models.BigIntegerField(db_index=True)),
+            ],
+            options={
+                'db_table': 'orden_eliminada',
+                'ordering': ['Version'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Secuencia',
+            fields=[
+                ('Nombre', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('Valor', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'secuencia',
+            },
+        ),
+        migrations.AddField(
+            model_name='orden',
+            name='Version',
+            field=models.BigIntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(backfill_version, migrations.RunPython.noop),
+    ]
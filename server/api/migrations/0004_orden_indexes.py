@@ -0,0 +1,21 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_orden_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='orden',
+            index=models.Index(fields=['IdEstado', 'FechaCreacion', 'IdOrden'], name='orden_estado_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orden',
+            index=models.Index(fields=['FechaCreacion', 'IdOrden'], name='orden_fecha_idx'),
+        ),
+    ]
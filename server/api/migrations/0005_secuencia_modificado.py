@@ -0,0 +1,26 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:36
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def create_menu_secuencia(apps, schema_editor):
+    # Versión inicial del menú para ETag/Last-Modified
+    Secuencia = apps.get_model('api', 'Secuencia')
+    Secuencia.objects.get_or_create(Nombre='menu', defaults={'Valor': 1})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_orden_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='secuencia',
+            name='Modificado',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(create_menu_secuencia, migrations.RunPython.noop),
+    ]
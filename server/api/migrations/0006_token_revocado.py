@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_secuencia_modificado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TokenRevocado',
+            fields=[
+                ('Jti', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('Expira', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'db_table': 'token_revocado',
+            },
+        ),
+    ]
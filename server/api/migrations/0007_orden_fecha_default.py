@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:42
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_token_revocado'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='orden',
+            name='FechaCreacion',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
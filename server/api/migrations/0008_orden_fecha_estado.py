@@ -0,0 +1,25 @@
+from django.db import migrations, models
+from django.db.models import F
+import django.utils.timezone
+
+
+def fecha_estado_desde_creacion(apps, schema_editor):
+    # Sin historial previo, se asume que las órdenes están en su estado desde que se crearon
+    Orden = apps.get_model('api', 'Orden')
+    Orden.objects.update(FechaEstado=F('FechaCreacion'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_orden_fecha_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orden',
+            name='FechaEstado',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.RunPython(fecha_estado_desde_creacion, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:52
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_orden_fecha_estado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenDia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('Dimension', models.CharField(max_length=20)),
+                ('Clave', models.IntegerField(default=0)),
+                ('Ordenes', models.IntegerField(default=0)),
+                ('Unidades', models.IntegerField(default=0)),
+                ('Ingresos', models.FloatField(default=0)),
+                ('Preparaciones', models.IntegerField(default=0)),
+                ('SegundosPreparacion', models.FloatField(default=0)),
+                ('Dia', models.DateField()),
+            ],
+            options={
+                'db_table': 'resumen_dia',
+                'ordering': ['Dia', 'Dimension', 'Clave'],
+                'unique_together': {('Dia', 'Dimension', 'Clave')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumenHora',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('Dimension', models.CharField(max_length=20)),
+                ('Clave', models.IntegerField(default=0)),
+                ('Ordenes', models.IntegerField(default=0)),
+                ('Unidades', models.IntegerField(default=0)),
+                ('Ingresos', models.FloatField(default=0)),
+                ('Preparaciones', models.IntegerField(default=0)),
+                ('SegundosPreparacion', models.FloatField(default=0)),
+                ('Hora', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'resumen_hora',
+                'ordering': ['Hora', 'Dimension', 'Clave'],
+                'unique_together': {('Hora', 'Dimension', 'Clave')},
+            },
+        ),
+        migrations.CreateModel(
+            name='OrdenEstadoHistorial',
+            fields=[
+                ('IdHistorial', models.BigAutoField(primary_key=True, serialize=False)),
+                ('Fecha', models.DateTimeField(default=django.utils.timezone.now)),
+                ('Segundos', models.FloatField(default=0)),
+                ('Version', models.BigIntegerField(db_index=True)),
+                ('IdEstado', models.ForeignKey(db_column='IdEstado', on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.estado')),
+                ('IdEstadoAnterior', models.ForeignKey(db_column='IdEstadoAnterior', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.estado')),
+                ('IdOrden', models.ForeignKey(db_column='IdOrden', on_delete=django.db.models.deletion.CASCADE, related_name='historial_estados', to='api.orden')),
+                ('IdUsuario', models.ForeignKey(db_column='IdUsuario', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.usuario')),
+            ],
+            options={
+                'db_table': 'orden_estado_historial',
+                'ordering': ['IdHistorial'],
+                'indexes': [models.Index(fields=['IdOrden', 'Fecha'], name='historial_orden_fecha_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.1 on 2026-10-18 13:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_orden_estado_historial_resumenes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='orden',
+            index=models.Index(fields=['FechaCreacion', 'IdEstado', 'IdUsuario', 'IdMesa'], name='orden_ventas_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productoorden',
+            index=models.Index(fields=['IdOrden', 'IdProducto', 'Cantidad'], name='producto_orden_ventas_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.1 on 2026-10-18 14:01
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_ventas_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrdenIdempotencia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('Clave', models.CharField(max_length=255)),
+                ('Huella', models.CharField(max_length=64)),
+                ('IdOrden', models.IntegerField()),
+                ('Respuesta', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('Expira', models.DateTimeField(db_index=True)),
+                ('IdUsuario', models.ForeignKey(db_column='IdUsuario', on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.usuario')),
+            ],
+            options={
+                'db_table': 'orden_idempotencia',
+                'unique_together': {('IdUsuario', 'Clave')},
+            },
+        ),
+    ]
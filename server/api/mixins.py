@@ -0,0 +1,58 @@
+from django.conf import settings
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+
+from .cache import get_catalog
+
+
+class FastSerializerMixin:
+    """
+    Usa ``fast_serializer_class`` en las acciones de lectura si el basename del
+    viewset está en ``settings.FAST_SERIALIZERS``; así se puede activar o
+    desactivar por viewset (y comparar A/B) sin cambiar código.
+    """
+    fast_serializer_class = None
+    fast_serializer_actions = ('list', 'retrieve')
+
+    def use_fast_serializer(self):
+        return (
+            self.fast_serializer_class is not None
+            and self.action in self.fast_serializer_actions
+            and self.basename in getattr(settings, 'FAST_SERIALIZERS', ())
+        )
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if not self.use_fast_serializer():
+            return queryset
+        # El serializer rápido hace sus propias consultas; aquí solo se cargan
+        # los Ids y los campos necesarios para filtrar, ordenar y paginar.
+        pk_name = queryset.model._meta.pk.name
+        return queryset.select_related(None).prefetch_related(None).only(
+            pk_name, *self.fast_serializer_class.key_fields
+        )
+
+    def get_serializer_class(self):
+        if self.use_fast_serializer():
+            return self.fast_serializer_class
+        return super().get_serializer_class()
+
+
+class CatalogCacheMixin:
+    """Sirve list/retrieve de un catálogo desde ``api.cache`` en lugar de la base de datos."""
+
+    def get_catalog(self):
+        return get_catalog(self.queryset.model)
+
+    def list(self, request, *args, **kwargs):
+        data = self.get_catalog().data()
+        page = self.paginate_queryset(data)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        item = self.get_catalog().get_data(self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+        if item is None:
+            raise NotFound()
+        return Response(item)
@@ -1,4 +1,6 @@
-from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.utils import timezone
 from django.contrib.auth.hashers import make_password, check_password
 
 
@@ -84,12 +86,16 @@ class Usuario(models.Model):
         return self.Username
 
     def set_password(self, raw_password):
-        import bcrypt
-        self.Password = bcrypt.hashpw(raw_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        from .passwords import hash_password
+        self.Password = hash_password(raw_password)
 
     def check_password(self, raw_password):
-        import bcrypt
-        return bcrypt.checkpw(raw_password.encode('utf-8'), self.Password.encode('utf-8'))
+        from .passwords import check_password
+        return check_password(raw_password, self.Password)
+
+    def password_needs_rehash(self):
+        from .passwords import needs_rehash
+        return needs_rehash(self.Password)
 
 
 class Mesa(models.Model):
@@ -109,15 +115,35 @@ class Orden(models.Model):
     IdUsuario = models.ForeignKey(Usuario, on_delete=models.CASCADE, db_column='IdUsuario')
     IdMesa = models.ForeignKey(Mesa, on_delete=models.CASCADE, db_column='IdMesa')
     IdEstado = models.ForeignKey(Estado, on_delete=models.CASCADE, db_column='IdEstado')
-    FechaCreacion = models.DateTimeField(auto_now_add=True)
+    # default en lugar de auto_now_add para poder cargar historial con fechas pasadas
+    FechaCreacion = models.DateTimeField(default=timezone.now, editable=False)
+    # Marcador monotónico de cambios (ver Secuencia); permite sincronizar
+    # solo las órdenes creadas o modificadas después de un cursor.
+    Version = models.BigIntegerField(default=0, db_index=True)
+    # Momento en que la orden entró a su estado actual (tiempo en cada estado)
+    FechaEstado = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         db_table = 'orden'
         ordering = ['-FechaCreacion']
+        indexes = [
+            models.Index(fields=['IdEstado', 'FechaCreacion', 'IdOrden'], name='orden_estado_fecha_idx'),
+            models.Index(fields=['FechaCreacion', 'IdOrden'], name='orden_fecha_idx'),
+            # Cubre el filtro y las agrupaciones del reporte de ventas sin leer la tabla
+            models.Index(fields=['FechaCreacion', 'IdEstado', 'IdUsuario', 'IdMesa'], name='orden_ventas_idx'),
+        ]
 
     def __str__(self):
         return f"Orden {self.IdOrden} - Mesa {self.IdMesa.Mesa}"
 
+    @staticmethod
+    def siguiente_version(cantidad=1):
+        return Secuencia.siguiente('orden', cantidad)
+
+    @staticmethod
+    def version_actual():
+        return Secuencia.actual('orden')
+
 
 class ProductoOrden(models.Model):
     IdProducto = models.ForeignKey(Producto, on_delete=models.CASCADE, db_column='IdProducto')
@@ -128,7 +154,185 @@ class ProductoOrden(models.Model):
     class Meta:
         db_table = 'producto_orden'
         unique_together = [['IdProducto', 'IdOrden']]
+        indexes = [
+            # Productos y cantidades de una orden sin leer la tabla (reporte de ventas)
+            models.Index(fields=['IdOrden', 'IdProducto', 'Cantidad'], name='producto_orden_ventas_idx'),
+        ]
 
     def __str__(self):
         return f"{self.IdProducto.NombreProducto} x{self.Cantidad} - Orden {self.IdOrden.IdOrden}"
 
+
+class OrdenEstadoHistorial(models.Model):
+    """Cada cambio de estado de una orden, con el tiempo que pasó en el estado anterior."""
+    IdHistorial = models.BigAutoField(primary_key=True)
+    IdOrden = models.ForeignKey(Orden, on_delete=models.CASCADE, db_column='IdOrden', related_name='historial_estados')
+    IdEstadoAnterior = models.ForeignKey(
+        Estado, on_delete=models.CASCADE, db_column='IdEstadoAnterior', related_name='+', null=True
+    )
+    IdEstado = models.ForeignKey(Estado, on_delete=models.CASCADE, db_column='IdEstado', related_name='+')
+    IdUsuario = models.ForeignKey(
+        Usuario, on_delete=models.SET_NULL, db_column='IdUsuario', related_name='+', null=True
+    )
+    Fecha = models.DateTimeField(default=timezone.now)
+    Segundos = models.FloatField(default=0)
+    # Versión de la orden asignada con el cambio: se confirma en orden (ver
+    # Secuencia), así los resúmenes avanzan por Version sin saltarse cambios.
+    Version = models.BigIntegerField(db_index=True)
+
+    class Meta:
+        db_table = 'orden_estado_historial'
+        ordering = ['IdHistorial']
+        indexes = [
+            models.Index(fields=['IdOrden', 'Fecha'], name='historial_orden_fecha_idx'),
+        ]
+
+    def __str__(self):
+        return f"Orden {self.IdOrden_id}: {self.IdEstadoAnterior_id} -> {self.IdEstado_id}"
+
+    @classmethod
+    def registrar(cls, orden, anterior, desde, id_usuario=None):
+        """Guarda el paso de ``orden`` desde ``anterior`` (donde estaba desde ``desde``) a su estado actual."""
+        historial = cls.nuevo(orden, anterior, desde, id_usuario)
+        historial.save(force_insert=True)
+        return historial
+
+    @classmethod
+    def nuevo(cls, orden, anterior, desde, id_usuario=None):
+        """Como ``registrar`` pero sin guardar (para ``bulk_create``)."""
+        return cls(
+            IdOrden=orden,
+            IdEstadoAnterior=anterior,
+            IdEstado=orden.IdEstado,
+            IdUsuario_id=id_usuario,
+            Fecha=orden.FechaEstado,
+            Segundos=max((orden.FechaEstado - desde).total_seconds(), 0),
+            Version=orden.Version,
+        )
+
+
+class Resumen(models.Model):
+    """
+    Totales de un periodo por dimensión: ``total`` (Clave 0), ``producto``,
+    ``tipo_producto``, ``mesa`` o ``usuario`` (Clave es el Id).
+
+    Ordenes, Unidades e Ingresos cuentan órdenes entregadas; Preparaciones y
+    SegundosPreparacion, órdenes que llegaron a Listo (desde su creación).
+    Los mantiene ``api.resumenes.actualizar_resumenes``.
+    """
+    Dimension = models.CharField(max_length=20)
+    Clave = models.IntegerField(default=0)
+    Ordenes = models.IntegerField(default=0)
+    Unidades = models.IntegerField(default=0)
+    Ingresos = models.FloatField(default=0)
+    Preparaciones = models.IntegerField(default=0)
+    SegundosPreparacion = models.FloatField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class ResumenHora(Resumen):
+    Hora = models.DateTimeField()
+
+    class Meta:
+        db_table = 'resumen_hora'
+        ordering = ['Hora', 'Dimension', 'Clave']
+        unique_together = [['Hora', 'Dimension', 'Clave']]
+
+    def __str__(self):
+        return f"{self.Hora} {self.Dimension} {self.Clave}"
+
+
+class ResumenDia(Resumen):
+    Dia = models.DateField()
+
+    class Meta:
+        db_table = 'resumen_dia'
+        ordering = ['Dia', 'Dimension', 'Clave']
+        unique_together = [['Dia', 'Dimension', 'Clave']]
+
+    def __str__(self):
+        return f"{self.Dia} {self.Dimension} {self.Clave}"
+
+
+class OrdenEliminada(models.Model):
+    IdOrden = models.IntegerField(primary_key=True)
+    Version = models.BigIntegerField(db_index=True)
+
+    class Meta:
+        db_table = 'orden_eliminada'
+        ordering = ['Version']
+
+    def __str__(self):
+        return f"Orden eliminada {self.IdOrden}"
+
+
+class Secuencia(models.Model):
+    """Contador con nombre guardado en una fila (``orden``, ``menu``, ``resumenes``)."""
+    Nombre = models.CharField(max_length=50, primary_key=True)
+    Valor = models.BigIntegerField(default=0)
+    Modificado = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'secuencia'
+
+    def __str__(self):
+        return f"{self.Nombre}: {self.Valor}"
+
+    @classmethod
+    def siguiente(cls, nombre, cantidad=1):
+        """
+        Incrementa en ``cantidad`` y retorna el valor de la secuencia; los
+        valores reservados son ``valor - cantidad + 1`` .. ``valor``.
+
+        El UPDATE bloquea la fila hasta que termine la transacción externa, de
+        modo que los valores se confirman en el mismo orden en que se asignan.
+        """
+        with transaction.atomic():
+            actualizadas = cls.objects.filter(pk=nombre).update(
+                Valor=models.F('Valor') + cantidad, Modificado=timezone.now()
+            )
+            if not actualizadas:
+                cls.objects.create(Nombre=nombre, Valor=cantidad)
+                return cantidad
+            return cls.objects.values_list('Valor', flat=True).get(pk=nombre)
+
+    @classmethod
+    def actual(cls, nombre):
+        return cls.objects.filter(pk=nombre).values_list('Valor', flat=True).first() or 0
+
+    @classmethod
+    def estado(cls, nombre):
+        """Retorna ``(Valor, Modificado)``; ``(0, None)`` si la secuencia no existe."""
+        return cls.objects.filter(pk=nombre).values_list('Valor', 'Modificado').first() or (0, None)
+
+
+class TokenRevocado(models.Model):
+    # jti del refresh token; la PK hace que revisar y revocar sea una sola búsqueda por índice
+    Jti = models.CharField(max_length=64, primary_key=True)
+    Expira = models.DateTimeField(db_index=True)
+
+    class Meta:
+        db_table = 'token_revocado'
+
+    def __str__(self):
+        return self.Jti
+
+
+class OrdenIdempotencia(models.Model):
+    """Respuesta de una orden creada con ``Idempotency-Key``, para repetirla si el cliente reintenta."""
+    IdUsuario = models.ForeignKey(Usuario, on_delete=models.CASCADE, db_column='IdUsuario', related_name='+')
+    Clave = models.CharField(max_length=255)
+    # sha256 del cuerpo: la misma clave con otro cuerpo es un error del cliente
+    Huella = models.CharField(max_length=64)
+    IdOrden = models.IntegerField()
+    Respuesta = models.JSONField(encoder=DjangoJSONEncoder)
+    Expira = models.DateTimeField(db_index=True)
+
+    class Meta:
+        db_table = 'orden_idempotencia'
+        unique_together = [['IdUsuario', 'Clave']]
+
+    def __str__(self):
+        return f"{self.Clave} -> Orden {self.IdOrden}"
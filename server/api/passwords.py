@@ -0,0 +1,94 @@
+"""
+Hash y verificación de contraseñas con bcrypt en un pool acotado de hilos.
+
+bcrypt libera el GIL, así que el pool limita cuántos núcleos se dedican a
+hashear a la vez (``PASSWORD_HASH_WORKERS``) y cuántas solicitudes pueden
+esperar turno (``PASSWORD_HASH_QUEUE``). Cuando el pool está lleno se lanza
+``PasswordHasherBusy`` de inmediato en lugar de encolar sin límite, para que
+un pico de logins no deje sin hilos al resto del tráfico.
+
+La espera no es gratis: cada solicitud en la cola es un hilo del servidor
+(worker WSGI) bloqueado en ``future.result()`` hasta que bcrypt termina. Con
+``workers + cola`` solicitudes de login, esos hilos no atienden otras rutas,
+por eso la cola por defecto es pequeña (igual al número de workers).
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+from django.conf import settings
+
+from . import metrics
+
+
+class PasswordHasherBusy(Exception):
+    """El pool de hash está saturado; el cliente debe reintentar."""
+
+
+class BcryptPool:
+    def __init__(self, workers, queue_size):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def run(self, fn, *args):
+        """Ejecuta ``fn`` en el pool y bloquea el hilo que llama hasta el resultado."""
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy()
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = BcryptPool(
+                    getattr(settings, 'PASSWORD_HASH_WORKERS', 4),
+                    getattr(settings, 'PASSWORD_HASH_QUEUE', 4),
+                )
+    return _pool
+
+
+def _rounds():
+    return getattr(settings, 'BCRYPT_ROUNDS', 12)
+
+
+def _hash(raw_password, rounds):
+    inicio = time.perf_counter()
+    hashed = bcrypt.hashpw(raw_password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+    metrics.bcrypt_duracion.observe(time.perf_counter() - inicio, 'hash')
+    return hashed
+
+
+def _check(raw_password, hashed):
+    inicio = time.perf_counter()
+    valido = bcrypt.checkpw(raw_password.encode('utf-8'), hashed.encode('utf-8'))
+    metrics.bcrypt_duracion.observe(time.perf_counter() - inicio, 'check')
+    return valido
+
+
+def hash_password(raw_password):
+    return get_pool().run(_hash, raw_password, _rounds())
+
+
+def check_password(raw_password, hashed):
+    return get_pool().run(_check, raw_password, hashed)
+
+
+def needs_rehash(hashed):
+    """True si el hash se generó con un costo distinto a ``BCRYPT_ROUNDS``."""
+    try:
+        return int(hashed.split('$')[2]) != _rounds()
+    except (IndexError, ValueError):
+        return True
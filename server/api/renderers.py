@@ -0,0 +1,13 @@
+from rest_framework.renderers import JSONRenderer
+
+
+class CompactoJSONRenderer(JSONRenderer):
+    """
+    Representación compacta de listas de órdenes: cada orden lleva solo Ids y
+    los objetos referenciados se envían una vez en ``incluidos``.
+
+    Se selecciona con ``?format=compacto`` o con la cabecera
+    ``Accept: application/vnd.kitchon.compacto+json``.
+    """
+    media_type = 'application/vnd.kitchon.compacto+json'
+    format = 'compacto'
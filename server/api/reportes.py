@@ -0,0 +1,76 @@
+"""
+Reporte de ventas calculado en la base de datos.
+
+Las sumas se hacen con ``annotate``/``aggregate`` sobre ``ProductoOrden``
+(unidades e ingresos = Cantidad * Producto.Valor) sin cargar las filas en
+Python, y el resultado se transmite en partes: la memoria usada no depende de
+cuántos grupos tenga el rango.
+"""
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, F, FloatField, Sum
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from .cache import get_catalog
+from .models import Estado, ProductoOrden
+
+
+# agrupar -> (columna del Id, columna del nombre)
+AGRUPACIONES = {
+    'producto': ('IdProducto', 'IdProducto__NombreProducto'),
+    'tipo_producto': ('IdProducto__IdTipoProducto', 'IdProducto__IdTipoProducto__TipoProducto'),
+    'mesero': ('IdOrden__IdUsuario', 'IdOrden__IdUsuario__Username'),
+    'mesa': ('IdOrden__IdMesa', 'IdOrden__IdMesa__Mesa'),
+    'hora': None,
+}
+
+CHUNK_SIZE = 2000
+
+
+def _totales():
+    return {
+        'Ordenes': Count('IdOrden', distinct=True),
+        'Unidades': Sum('Cantidad'),
+        'Ingresos': Sum(F('Cantidad') * F('IdProducto__Valor'), output_field=FloatField()),
+    }
+
+
+def lineas_vendidas(inicio, fin):
+    """Productos de las órdenes creadas en ``[inicio, fin)``, sin las canceladas."""
+    lineas = ProductoOrden.objects.filter(
+        IdOrden__FechaCreacion__gte=inicio, IdOrden__FechaCreacion__lt=fin
+    )
+    cancelado = get_catalog(Estado).get_by_name('Cancelado')
+    if cancelado is not None:
+        lineas = lineas.exclude(IdOrden__IdEstado=cancelado.IdEstado)
+    return lineas
+
+
+def ventas(inicio, fin, agrupar):
+    """Retorna ``(totales, filas)``; ``filas`` es un iterador que lee por partes."""
+    lineas = lineas_vendidas(inicio, fin)
+    totales = lineas.aggregate(**_totales())
+
+    if agrupar == 'hora':
+        grupos = lineas.annotate(
+            Hora=TruncHour('IdOrden__FechaCreacion', tzinfo=timezone.get_current_timezone())
+        ).values('Hora').annotate(**_totales()).order_by('Hora')
+    else:
+        id_columna, nombre_columna = AGRUPACIONES[agrupar]
+        grupos = lineas.values(
+            Id=F(id_columna), Nombre=F(nombre_columna)
+        ).annotate(**_totales()).order_by('-Ingresos', 'Id')
+    return totales, grupos.iterator(chunk_size=CHUNK_SIZE)
+
+
+def ventas_json(encabezado, totales, filas):
+    """Genera el JSON por partes: primero el encabezado y los totales, luego cada fila."""
+    inicio = json.dumps({**encabezado, 'totales': totales}, cls=DjangoJSONEncoder, ensure_ascii=False)
+    yield inicio[:-1] + ', "results": ['
+    separador = ''
+    for fila in filas:
+        yield separador + json.dumps(fila, cls=DjangoJSONEncoder, ensure_ascii=False)
+        separador = ', '
+    yield ']}'
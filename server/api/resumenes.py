@@ -0,0 +1,135 @@
+"""
+Mantenimiento incremental de los resúmenes por hora y por día
+(``ResumenHora`` y ``ResumenDia``) a partir del historial de estados.
+
+Cada ejecución procesa los cambios con ``Version`` mayor a la marca guardada
+en la secuencia ``resumenes`` y la avanza en la misma transacción en que suma
+los totales, de modo que cada cambio se cuenta una sola vez aunque el proceso
+se interrumpa. Las órdenes se agrupan por la hora local de su creación.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import get_catalog
+from .models import Estado, Orden, OrdenEstadoHistorial, ProductoOrden, ResumenDia, ResumenHora, Secuencia
+
+
+RESUMENES_SECUENCIA = 'resumenes'
+DIMENSIONES = ('total', 'producto', 'tipo_producto', 'mesa', 'usuario')
+CAMPOS = ('Ordenes', 'Unidades', 'Ingresos', 'Preparaciones', 'SegundosPreparacion')
+LOTE = 5000
+
+
+def actualizar_resumenes(lote=LOTE):
+    """Procesa los cambios pendientes en lotes de ``lote`` cambios; retorna cuántos procesó."""
+    estados = get_catalog(Estado)
+    ids_estado = [
+        estado.IdEstado for estado in map(estados.get_by_name, ('Listo', 'Entregado')) if estado is not None
+    ]
+    hasta = Orden.version_actual()
+    procesados = 0
+    while True:
+        with transaction.atomic():
+            marca, _ = Secuencia.objects.select_for_update().get_or_create(Nombre=RESUMENES_SECUENCIA)
+            pendientes = OrdenEstadoHistorial.objects.filter(Version__gt=marca.Valor, Version__lte=hasta)
+            versiones = list(pendientes.order_by('Version').values_list('Version', flat=True)[:lote])
+            if not versiones:
+                return procesados
+            # Todos los cambios de la última versión entran en el mismo lote
+            cambios = list(pendientes.filter(
+                Version__lte=versiones[-1], IdEstado__in=ids_estado
+            ).values_list('IdOrden', 'IdEstado__Estado', 'Fecha'))
+            _sumar(cambios)
+            marca.Valor = versiones[-1]
+            marca.Modificado = timezone.now()
+            marca.save()
+        procesados += len(versiones)
+
+
+def _sumar(cambios):
+    ids = {id_orden for id_orden, _, _ in cambios}
+    ordenes = {
+        row[0]: row[1:]
+        for row in Orden.objects.filter(pk__in=ids).values_list('IdOrden', 'FechaCreacion', 'IdMesa', 'IdUsuario')
+    }
+    lineas = defaultdict(list)
+    for id_orden, *linea in ProductoOrden.objects.filter(IdOrden__in=ids).values_list(
+        'IdOrden', 'IdProducto', 'IdProducto__IdTipoProducto', 'Cantidad', 'IdProducto__Valor'
+    ):
+        lineas[id_orden].append(linea)
+
+    # (periodo, dimension, clave) -> [Ordenes, Unidades, Ingresos, Preparaciones, SegundosPreparacion]
+    por_hora = defaultdict(lambda: [0, 0, 0.0, 0, 0.0])
+    for id_orden, estado, fecha in cambios:
+        if id_orden not in ordenes:
+            continue  # eliminada después del cambio
+        creacion, id_mesa, id_usuario = ordenes[id_orden]
+        hora = timezone.localtime(creacion).replace(minute=0, second=0, microsecond=0)
+        productos = lineas[id_orden]
+
+        if estado == 'Listo':
+            segundos = max((fecha - creacion).total_seconds(), 0)
+            claves = [('total', 0), ('mesa', id_mesa), ('usuario', id_usuario)]
+            claves += [('producto', id_producto) for id_producto, _, _, _ in productos]
+            claves += [('tipo_producto', id_tipo) for id_tipo in {id_tipo for _, id_tipo, _, _ in productos}]
+            for dimension, clave in claves:
+                totales = por_hora[(hora, dimension, clave)]
+                totales[3] += 1
+                totales[4] += segundos
+        else:
+            unidades = sum(cantidad for _, _, cantidad, _ in productos)
+            ingresos = sum(cantidad * valor for _, _, cantidad, valor in productos)
+            for dimension, clave in (('total', 0), ('mesa', id_mesa), ('usuario', id_usuario)):
+                totales = por_hora[(hora, dimension, clave)]
+                totales[0] += 1
+                totales[1] += unidades
+                totales[2] += ingresos
+            por_tipo = defaultdict(lambda: [0, 0.0])
+            for id_producto, id_tipo, cantidad, valor in productos:
+                totales = por_hora[(hora, 'producto', id_producto)]
+                totales[0] += 1
+                totales[1] += cantidad
+                totales[2] += cantidad * valor
+                por_tipo[id_tipo][0] += cantidad
+                por_tipo[id_tipo][1] += cantidad * valor
+            for id_tipo, (cantidad, valor) in por_tipo.items():
+                totales = por_hora[(hora, 'tipo_producto', id_tipo)]
+                totales[0] += 1
+                totales[1] += cantidad
+                totales[2] += valor
+
+    por_dia = defaultdict(lambda: [0, 0, 0.0, 0, 0.0])
+    for (hora, dimension, clave), totales in por_hora.items():
+        acumulado = por_dia[(hora.date(), dimension, clave)]
+        for index, valor in enumerate(totales):
+            acumulado[index] += valor
+
+    _guardar(ResumenHora, 'Hora', por_hora)
+    _guardar(ResumenDia, 'Dia', por_dia)
+
+
+def _guardar(model, campo_periodo, totales):
+    """Suma ``totales`` a las filas existentes (bulk_update) y crea las que faltan (bulk_create)."""
+    if not totales:
+        return
+    periodos = {periodo for periodo, _, _ in totales}
+    existentes = {
+        (getattr(fila, campo_periodo), fila.Dimension, fila.Clave): fila
+        for fila in model.objects.filter(**{f'{campo_periodo}__in': periodos})
+    }
+    nuevas = []
+    actualizadas = []
+    for (periodo, dimension, clave), valores in totales.items():
+        fila = existentes.get((periodo, dimension, clave))
+        if fila is None:
+            nuevas.append(model(
+                **{campo_periodo: periodo}, Dimension=dimension, Clave=clave, **dict(zip(CAMPOS, valores))
+            ))
+            continue
+        for campo, valor in zip(CAMPOS, valores):
+            setattr(fila, campo, getattr(fila, campo) + valor)
+        actualizadas.append(fila)
+    model.objects.bulk_update(actualizadas, CAMPOS, batch_size=1000)
+    model.objects.bulk_create(nuevas, batch_size=1000)
@@ -1,9 +1,13 @@
 from rest_framework import serializers
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, TextField, Value, When
+from django.db.models.functions import Concat
+from .cache import get_catalog
+from .transiciones import ConflictoEstado, permitidas
 from .models import (
     Estado, TipoProducto, TipoUsuario, Persona,
     Producto, Usuario, Mesa, Orden, ProductoOrden
 )
-from django.db import models
 
 
 class EstadoSerializer(serializers.ModelSerializer):
@@ -80,14 +84,243 @@ class OrdenSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Orden
-        fields = ['IdOrden', 'IdUsuario', 'IdMesa', 'IdEstado', 'FechaCreacion', 'Usuario', 'Mesa', 'Estado', 'ProductosOrden']
+        fields = ['IdOrden', 'IdUsuario', 'IdMesa', 'IdEstado', 'FechaCreacion', 'Version', 'Usuario', 'Mesa', 'Estado', 'ProductosOrden']
+        # El servidor asigna la versión en cada escritura (ver Secuencia)
+        read_only_fields = ['Version']
 
 
-class CreateOrdenSerializer(serializers.Serializer):
+_fecha_field = serializers.DateTimeField()
+
+
+def ordenes_compacto(ordenes):
+    """
+    Serializa órdenes solo con Ids y retorna ``(resultados, incluidos)``.
+
+    ``incluidos`` contiene una vez cada producto, usuario, mesa, estado y tipo
+    referenciado, indexado por su Id, en lugar de repetirlos en cada orden.
+    """
+    ids_orden = [orden.IdOrden for orden in ordenes]
+    lineas = {}
+    for linea in ProductoOrden.objects.filter(IdOrden__in=ids_orden).values(
+        'IdOrden', 'IdProducto', 'Cantidad', 'Notas'
+    ).order_by('id'):
+        lineas.setdefault(linea.pop('IdOrden'), []).append(linea)
+
+    resultados = [
+        {
+            'IdOrden': orden.IdOrden,
+            'IdUsuario': orden.IdUsuario_id,
+            'IdMesa': orden.IdMesa_id,
+            'IdEstado': orden.IdEstado_id,
+            'FechaCreacion': _fecha_field.to_representation(orden.FechaCreacion),
+            'Version': orden.Version,
+            'Productos': lineas.get(orden.IdOrden, []),
+        }
+        for orden in ordenes
+    ]
+
+    productos = {
+        producto['IdProducto']: producto
+        for producto in Producto.objects.filter(
+            pk__in={linea['IdProducto'] for items in lineas.values() for linea in items}
+        ).values('IdProducto', 'IdTipoProducto', 'NombreProducto', 'Valor', 'IdEstado')
+    }
+    usuarios = {
+        usuario['IdUsuario']: usuario
+        for usuario in Usuario.objects.filter(
+            pk__in={orden.IdUsuario_id for orden in ordenes}
+        ).values(
+            'IdUsuario', 'IdPersona', 'IdTipoUsuario', 'Username', 'IdEstado',
+            PrimerNombre=F('IdPersona__PrimerNombre'),
+            SegundoNombre=F('IdPersona__SegundoNombre'),
+            PrimerApellido=F('IdPersona__PrimerApellido'),
+            SegundoApellido=F('IdPersona__SegundoApellido'),
+        )
+    }
+    ids_estado = (
+        {orden.IdEstado_id for orden in ordenes}
+        | {producto['IdEstado'] for producto in productos.values()}
+        | {usuario['IdEstado'] for usuario in usuarios.values()}
+    )
+
+    tipos_producto = get_catalog(TipoProducto)
+    tipos_usuario = get_catalog(TipoUsuario)
+    mesas = get_catalog(Mesa)
+    estados = get_catalog(Estado)
+    incluidos = {
+        'productos': productos,
+        'tipos_producto': {
+            pk: tipos_producto.get_data(pk)
+            for pk in {producto['IdTipoProducto'] for producto in productos.values()}
+        },
+        'usuarios': usuarios,
+        'tipos_usuario': {
+            pk: tipos_usuario.get_data(pk)
+            for pk in {usuario['IdTipoUsuario'] for usuario in usuarios.values()}
+        },
+        'mesas': {pk: mesas.get_data(pk) for pk in {orden.IdMesa_id for orden in ordenes}},
+        'estados': {pk: estados.get_data(pk) for pk in ids_estado},
+    }
+    return resultados, incluidos
+
+
+class CreateProductoOrdenSerializer(serializers.Serializer):
+    IdProducto = serializers.IntegerField()
+    Cantidad = serializers.IntegerField(default=1, min_value=1)
+    Notas = serializers.CharField(required=False, allow_null=True, allow_blank=True)
+
+
+class OrdenEntradaSerializer(serializers.Serializer):
+    """Campos de una orden nueva, validados sin consultar la base de datos."""
     IdUsuario = serializers.IntegerField()
     IdMesa = serializers.IntegerField()
     IdEstado = serializers.IntegerField()
-    Productos = serializers.ListField(
-        child=serializers.DictField()
-    )
+    Productos = CreateProductoOrdenSerializer(many=True, allow_empty=False)
+
+    def validate(self, attrs):
+        ids_producto = [item['IdProducto'] for item in attrs['Productos']]
+        if len(ids_producto) != len(set(ids_producto)):
+            raise serializers.ValidationError({'Productos': 'Productos duplicados en la orden'})
+        return attrs
+
+
+class OrdenLoteSerializer(OrdenEntradaSerializer):
+    """Orden de un lote de sincronización; ``Clave`` es su Idempotency-Key (opcional)."""
+    Clave = serializers.CharField(required=False, max_length=255)
+
+
+class CreateOrdenSerializer(OrdenEntradaSerializer):
+    def validate(self, attrs):
+        # Resolver todas las referencias con una consulta por tabla; las
+        # instancias quedan en attrs para construir la respuesta sin recargar.
+        attrs = super().validate(attrs)
+        ids_producto = [item['IdProducto'] for item in attrs['Productos']]
+
+        productos = Producto.objects.select_related('IdTipoProducto', 'IdEstado').in_bulk(ids_producto)
+        faltantes = [pk for pk in ids_producto if pk not in productos]
+        if faltantes:
+            raise serializers.ValidationError({'Productos': f'Productos no encontrados: {faltantes}'})
+
+        usuario = Usuario.objects.select_related(
+            'IdPersona', 'IdTipoUsuario', 'IdEstado'
+        ).filter(pk=attrs['IdUsuario']).first()
+        if usuario is None:
+            raise serializers.ValidationError({'IdUsuario': 'Usuario no encontrado'})
+
+        mesa = get_catalog(Mesa).get(attrs['IdMesa'])
+        if mesa is None:
+            raise serializers.ValidationError({'IdMesa': 'Mesa no encontrada'})
+
+        estado = get_catalog(Estado).get(attrs['IdEstado'])
+        if estado is None:
+            raise serializers.ValidationError({'IdEstado': 'Estado no encontrado'})
+
+        attrs['usuario'] = usuario
+        attrs['mesa'] = mesa
+        attrs['estado'] = estado
+        attrs['productos'] = productos
+        return attrs
+
+    def create(self, validated_data):
+        productos = validated_data['productos']
+        with transaction.atomic():
+            orden = Orden.objects.create(
+                IdUsuario=validated_data['usuario'],
+                IdMesa=validated_data['mesa'],
+                IdEstado=validated_data['estado'],
+                Version=Orden.siguiente_version()
+            )
+            lineas = ProductoOrden.objects.bulk_create([
+                ProductoOrden(
+                    IdProducto=productos[item['IdProducto']],
+                    IdOrden=orden,
+                    Cantidad=item['Cantidad'],
+                    Notas=item.get('Notas')
+                )
+                for item in validated_data['Productos']
+            ])
+        set_prefetched(orden, 'productos_orden', lineas)
+        return orden
+
+
+class AgregarProductosSerializer(serializers.Serializer):
+    """Productos que se suman a una orden abierta (``save(IdOrden=...)``)."""
+    Productos = CreateProductoOrdenSerializer(many=True, allow_empty=False)
+
+    def validate(self, attrs):
+        ids_producto = [item['IdProducto'] for item in attrs['Productos']]
+        if len(ids_producto) != len(set(ids_producto)):
+            raise serializers.ValidationError({'Productos': 'Productos duplicados en la petición'})
+        existentes = set(Producto.objects.filter(pk__in=ids_producto).values_list('IdProducto', flat=True))
+        faltantes = [pk for pk in ids_producto if pk not in existentes]
+        if faltantes:
+            raise serializers.ValidationError({'Productos': f'Productos no encontrados: {faltantes}'})
+        return attrs
+
+    def create(self, validated_data):
+        """
+        Suma la cantidad a las líneas que ya existen (un UPDATE con ``F()``) y
+        crea las demás con ``bulk_create``. Retorna la versión de la orden y
+        la cantidad final de cada producto enviado, sin recargar la orden.
+        Lanza ``Orden.DoesNotExist`` o ``ConflictoEstado`` si la orden está cerrada.
+        """
+        id_orden = validated_data['IdOrden']
+        items = {item['IdProducto']: item for item in validated_data['Productos']}
+        # Abiertas: las que aún pueden cambiar de estado (no Entregado ni Cancelado)
+        abiertos = list(permitidas())
+        with transaction.atomic():
+            # La versión se toma primero: bloquea la secuencia, así dos
+            # peticiones no crean la misma línea a la vez.
+            version = Orden.siguiente_version()
+            if not Orden.objects.filter(pk=id_orden, IdEstado__in=abiertos).update(Version=version):
+                id_estado = Orden.objects.filter(pk=id_orden).values_list('IdEstado', flat=True).first()
+                if id_estado is None:
+                    raise Orden.DoesNotExist()
+                raise ConflictoEstado('La orden está cerrada', id_estado)
+
+            lineas = ProductoOrden.objects.filter(IdOrden=id_orden, IdProducto__in=items)
+            existentes = set(lineas.values_list('IdProducto', flat=True))
+            if existentes:
+                cambios = {'Cantidad': F('Cantidad') + Case(
+                    *(When(IdProducto=pk, then=Value(items[pk]['Cantidad'])) for pk in existentes),
+                    output_field=IntegerField(),
+                )}
+                # Las notas nuevas se agregan a las que ya tenía la línea
+                notas = {pk: items[pk]['Notas'] for pk in existentes if items[pk].get('Notas')}
+                if notas:
+                    cambios['Notas'] = Case(
+                        *(When(IdProducto=pk, Notas__isnull=True, then=Value(nota)) for pk, nota in notas.items()),
+                        *(When(IdProducto=pk, Notas='', then=Value(nota)) for pk, nota in notas.items()),
+                        *(
+                            When(IdProducto=pk, then=Concat(F('Notas'), Value(f'; {nota}'), output_field=TextField()))
+                            for pk, nota in notas.items()
+                        ),
+                        default=F('Notas'),
+                        output_field=TextField(),
+                    )
+                lineas.filter(IdProducto__in=existentes).update(**cambios)
+            ProductoOrden.objects.bulk_create([
+                ProductoOrden(
+                    IdProducto_id=pk, IdOrden_id=id_orden, Cantidad=item['Cantidad'], Notas=item.get('Notas')
+                )
+                for pk, item in items.items() if pk not in existentes
+            ])
+            cantidades = dict(lineas.values_list('IdProducto', 'Cantidad'))
+
+        return {
+            'IdOrden': id_orden,
+            'Version': version,
+            'Productos': [
+                {'IdProducto': pk, 'Cantidad': cantidades[pk], 'Nuevo': pk not in existentes} for pk in items
+            ],
+        }
+
 
+def set_prefetched(instance, related_name, objs):
+    """Llena la caché de prefetch de una relación inversa con objetos ya en memoria."""
+    queryset = getattr(instance, related_name).get_queryset()
+    queryset._result_cache = list(objs)
+    queryset._prefetch_done = True
+    if not hasattr(instance, '_prefetched_objects_cache'):
+        instance._prefetched_objects_cache = {}
+    instance._prefetched_objects_cache[related_name] = queryset
@@ -0,0 +1,132 @@
+"""
+Creación de órdenes en lote para las tabletas que se reconectan.
+
+Cada orden se valida por separado (una inválida no impide crear las demás),
+pero las referencias de todo el lote se resuelven con una consulta por tabla
+(Usuario, Producto; Mesa y Estado salen de la caché de catálogos) y las filas
+se insertan con ``bulk_create`` en una sola transacción. Las órdenes con
+``Clave`` usan la misma idempotencia que ``POST /api/ordenes/``: si la tableta
+reenvía el lote, las que ya se crearon se repiten en lugar de duplicarse.
+"""
+from django.db import IntegrityError, transaction
+
+from . import idempotencia
+from .cache import get_catalog
+from .models import Estado, Mesa, Orden, Producto, ProductoOrden, Usuario
+from .serializers import OrdenLoteSerializer, OrdenSerializer, set_prefetched
+
+
+def crear_ordenes(items, id_usuario):
+    """
+    Retorna ``(creadas, resultados)``: las órdenes creadas y un resultado por
+    elemento de ``items``, en el mismo orden.
+    """
+    try:
+        return _crear_ordenes(items, id_usuario)
+    except IntegrityError:
+        # Otra petición guardó alguna de las claves a la vez: se deshizo el
+        # lote y al repetirlo esas órdenes salen como repetidas.
+        return _crear_ordenes(items, id_usuario)
+
+
+def _crear_ordenes(items, id_usuario):
+    resultados = [None] * len(items)
+    validas = []
+    for indice, item in enumerate(items):
+        serializer = OrdenLoteSerializer(data=item)
+        if serializer.is_valid():
+            validas.append((indice, serializer.validated_data))
+        else:
+            resultados[indice] = {'ok': False, 'errores': serializer.errors}
+
+    # Claves repetidas dentro del lote: solo cuenta la primera
+    claves = {}
+    repetidas = set()
+    for indice, datos in validas:
+        clave = datos.get('Clave')
+        if clave is None:
+            continue
+        if clave in claves:
+            resultados[indice] = {'ok': False, 'errores': {'Clave': 'Clave repetida en el lote'}}
+            repetidas.add(indice)
+        else:
+            claves[clave] = indice
+    if repetidas:
+        validas = [(indice, datos) for indice, datos in validas if indice not in repetidas]
+    registros = idempotencia.buscar_varias(id_usuario, list(claves))
+    huellas = {}
+    pendientes = []
+    for indice, datos in validas:
+        clave = datos.get('Clave')
+        if clave is not None:
+            huellas[indice] = idempotencia.huella({k: v for k, v in items[indice].items() if k != 'Clave'})
+            registro = registros.get(clave)
+            if registro is not None:
+                if registro.huella != huellas[indice]:
+                    resultados[indice] = {'ok': False, 'errores': {'Clave': 'La clave ya se usó con otra orden'}}
+                else:
+                    resultados[indice] = {'ok': True, 'repetida': True, 'orden': registro.respuesta}
+                continue
+        pendientes.append((indice, datos))
+
+    ids_usuario = {datos['IdUsuario'] for _, datos in pendientes}
+    ids_producto = {item['IdProducto'] for _, datos in pendientes for item in datos['Productos']}
+    usuarios = Usuario.objects.select_related(
+        'IdPersona', 'IdTipoUsuario', 'IdEstado'
+    ).in_bulk(ids_usuario) if ids_usuario else {}
+    productos = Producto.objects.select_related(
+        'IdTipoProducto', 'IdEstado'
+    ).in_bulk(ids_producto) if ids_producto else {}
+    mesas = get_catalog(Mesa)
+    estados = get_catalog(Estado)
+
+    nuevas = []
+    for indice, datos in pendientes:
+        errores = {}
+        usuario = usuarios.get(datos['IdUsuario'])
+        mesa = mesas.get(datos['IdMesa'])
+        estado = estados.get(datos['IdEstado'])
+        faltantes = [item['IdProducto'] for item in datos['Productos'] if item['IdProducto'] not in productos]
+        if usuario is None:
+            errores['IdUsuario'] = 'Usuario no encontrado'
+        if mesa is None:
+            errores['IdMesa'] = 'Mesa no encontrada'
+        if estado is None:
+            errores['IdEstado'] = 'Estado no encontrado'
+        if faltantes:
+            errores['Productos'] = f'Productos no encontrados: {faltantes}'
+        if errores:
+            resultados[indice] = {'ok': False, 'errores': errores}
+        else:
+            nuevas.append((indice, datos, Orden(IdUsuario=usuario, IdMesa=mesa, IdEstado=estado)))
+
+    creadas = []
+    if nuevas:
+        with transaction.atomic():
+            # Una versión por orden, reservadas de una vez (ver ``cambiar_estado_lote``)
+            ultima = Orden.siguiente_version(len(nuevas))
+            for version, (_, _, orden) in enumerate(nuevas, start=ultima - len(nuevas) + 1):
+                orden.Version = version
+            creadas = Orden.objects.bulk_create([orden for _, _, orden in nuevas])
+            lineas = ProductoOrden.objects.bulk_create([
+                ProductoOrden(
+                    IdProducto=productos[item['IdProducto']], IdOrden=orden,
+                    Cantidad=item['Cantidad'], Notas=item.get('Notas'),
+                )
+                for _, datos, orden in nuevas
+                for item in datos['Productos']
+            ])
+            por_orden = {}
+            for linea in lineas:
+                por_orden.setdefault(linea.IdOrden.IdOrden, []).append(linea)
+
+            respuestas = []
+            for indice, datos, orden in nuevas:
+                set_prefetched(orden, 'productos_orden', por_orden[orden.IdOrden])
+                data = OrdenSerializer(orden).data
+                resultados[indice] = {'ok': True, 'orden': data}
+                if datos.get('Clave') is not None:
+                    respuestas.append((datos['Clave'], huellas[indice], orden.IdOrden, data))
+            idempotencia.guardar_varias(id_usuario, respuestas)
+
+    return creadas, [{'indice': indice, **resultado} for indice, resultado in enumerate(resultados)]
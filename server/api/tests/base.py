@@ -0,0 +1,45 @@
+from rest_framework.test import APITestCase
+
+from api.cache import get_catalog
+from api.models import Estado, Mesa, Producto, Usuario
+from api.tokens import RevocableRefreshToken
+
+
+class KitchonTestCase(APITestCase):
+    """
+    Usa los datos iniciales de las migraciones (estados, usuarios, mesas y
+    productos) y autentica como ``admin`` con un token emitido directamente,
+    sin pasar por el login (bcrypt).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Usuario.objects.get(Username='admin')
+        cls.mesa = Mesa.objects.order_by('IdMesa').first()
+        cls.productos = list(Producto.objects.order_by('IdProducto')[:3])
+        cls.estados = {estado.Estado: estado.IdEstado for estado in Estado.objects.all()}
+
+    def setUp(self):
+        # Las cachés de catálogos son del proceso; no arrastrar datos entre pruebas
+        get_catalog(Estado).invalidate()
+        get_catalog(Mesa).invalidate()
+        token = RevocableRefreshToken.for_usuario(self.admin).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def orden_data(self, **kwargs):
+        data = {
+            'IdUsuario': self.admin.IdUsuario,
+            'IdMesa': self.mesa.IdMesa,
+            'IdEstado': self.estados['Pendiente'],
+            'Productos': [
+                {'IdProducto': self.productos[0].IdProducto, 'Cantidad': 2},
+                {'IdProducto': self.productos[1].IdProducto, 'Notas': 'sin sal'},
+            ],
+        }
+        data.update(kwargs)
+        return data
+
+    def crear_orden(self, **kwargs):
+        response = self.client.post('/api/ordenes/', self.orden_data(**kwargs), format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.data
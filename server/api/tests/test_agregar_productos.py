@@ -0,0 +1,57 @@
+from api.models import ProductoOrden
+
+from .base import KitchonTestCase
+
+
+class AgregarProductosTests(KitchonTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.orden = self.crear_orden()
+        self.url = f"/api/ordenes/{self.orden['IdOrden']}/productos/"
+
+    def lineas(self):
+        return {
+            id_producto: (cantidad, notas)
+            for id_producto, cantidad, notas in ProductoOrden.objects.filter(
+                IdOrden=self.orden['IdOrden']
+            ).values_list('IdProducto', 'Cantidad', 'Notas')
+        }
+
+    def test_suma_cantidades_y_crea_lineas(self):
+        primero, segundo, tercero = (producto.IdProducto for producto in self.productos)
+        response = self.client.post(self.url, {'Productos': [
+            {'IdProducto': primero, 'Cantidad': 3},
+            {'IdProducto': tercero, 'Notas': 'sin hielo'},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['Productos'], [
+            {'IdProducto': primero, 'Cantidad': 5, 'Nuevo': False},
+            {'IdProducto': tercero, 'Cantidad': 1, 'Nuevo': True},
+        ])
+        self.assertEqual(self.lineas(), {
+            primero: (5, None), segundo: (1, 'sin sal'), tercero: (1, 'sin hielo'),
+        })
+
+    def test_notas_de_lineas_existentes(self):
+        primero, segundo, _ = (producto.IdProducto for producto in self.productos)
+        self.client.post(self.url, {'Productos': [
+            {'IdProducto': primero, 'Notas': 'bien cocido'},
+            {'IdProducto': segundo, 'Notas': 'extra queso'},
+        ]}, format='json')
+
+        lineas = self.lineas()
+        self.assertEqual(lineas[primero], (3, 'bien cocido'))
+        self.assertEqual(lineas[segundo], (2, 'sin sal; extra queso'))
+
+    def test_orden_cerrada(self):
+        self.client.patch(
+            f"/api/ordenes/{self.orden['IdOrden']}/estado/", {'IdEstado': self.estados['Cancelado']}, format='json'
+        )
+        response = self.client.post(
+            self.url, {'Productos': [{'IdProducto': self.productos[2].IdProducto}]}, format='json'
+        )
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(len(self.lineas()), 2)
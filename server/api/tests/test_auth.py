@@ -0,0 +1,85 @@
+from api.cache import usuarios_activos
+from api.models import Persona, Usuario
+from api.tokens import RevocableRefreshToken
+
+from .base import KitchonTestCase
+
+
+class RefreshTests(KitchonTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.refresh = str(RevocableRefreshToken.for_usuario(self.admin))
+
+    def test_rotacion(self):
+        response = self.client.post('/api/auth/refresh/', {'refresh': self.refresh}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.data['refresh'], self.refresh)
+        self.assertIn('token', response.data)
+
+    def test_reusar_refresh_rotado(self):
+        rotado = self.client.post('/api/auth/refresh/', {'refresh': self.refresh}, format='json').data
+
+        response = self.client.post('/api/auth/refresh/', {'refresh': self.refresh}, format='json')
+
+        self.assertEqual(response.status_code, 401)
+        # El token nuevo sigue siendo válido
+        response = self.client.post('/api/auth/refresh/', {'refresh': rotado['refresh']}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_refresh_despues_de_logout(self):
+        self.client.post('/api/auth/logout/', {'refresh': self.refresh}, format='json')
+
+        response = self.client.post('/api/auth/refresh/', {'refresh': self.refresh}, format='json')
+
+        self.assertEqual(response.status_code, 401)
+
+
+class UsuariosActivosTests(KitchonTestCase):
+
+    def setUp(self):
+        super().setUp()
+        usuarios_activos.invalidate()
+        self.persona = Persona.objects.create(PrimerNombre='Ana', PrimerApellido='Ruiz')
+        self.usuario = Usuario.objects.create(
+            IdPersona=self.persona, IdTipoUsuario=self.admin.IdTipoUsuario,
+            Username='ana', Password='x', IdEstado_id=self.estados['Activo'],
+        )
+
+    def autenticar(self, usuario):
+        token = RevocableRefreshToken.for_usuario(usuario).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return self.client.get('/api/auth/verify/')
+
+    def test_usuario_desactivado(self):
+        self.assertEqual(self.autenticar(self.usuario).status_code, 200)
+
+        self.usuario.IdEstado_id = self.estados['Inactivo']
+        self.usuario.save()
+
+        self.assertEqual(self.autenticar(self.usuario).status_code, 401)
+        self.assertEqual(self.client.get('/api/mesas/').status_code, 401)
+
+    def test_usuario_creado_en_otro_proceso(self):
+        self.assertIsNotNone(usuarios_activos.get(self.admin.IdUsuario))
+        # bulk_create no emite señales: como si otro proceso hubiera creado el usuario
+        nuevo, = Usuario.objects.bulk_create([Usuario(
+            IdPersona=self.persona, IdTipoUsuario=self.admin.IdTipoUsuario,
+            Username='luis', Password='x', IdEstado_id=self.estados['Activo'],
+        )])
+
+        response = self.autenticar(nuevo)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['usuario']['Username'], 'luis')
+        self.assertEqual(self.client.get('/api/mesas/').status_code, 200)
+
+    def test_usuario_reactivado_en_otro_proceso(self):
+        Usuario.objects.filter(pk=self.usuario.pk).update(IdEstado_id=self.estados['Inactivo'])
+        usuarios_activos.invalidate()
+        self.assertEqual(self.autenticar(self.usuario).status_code, 401)
+
+        Usuario.objects.filter(pk=self.usuario.pk).update(IdEstado_id=self.estados['Activo'])
+
+        self.assertEqual(self.autenticar(self.usuario).status_code, 200)
@@ -0,0 +1,42 @@
+from api.cache import get_catalog
+from api.models import Estado, Mesa, TipoProducto
+
+from .base import KitchonTestCase
+
+
+class CatalogCacheSignalsTests(KitchonTestCase):
+
+    def setUp(self):
+        super().setUp()
+        for model in (Estado, TipoProducto, Mesa):
+            get_catalog(model).invalidate()
+
+    def test_guardar_y_eliminar_invalidan(self):
+        for model, campo in ((Estado, 'Estado'), (TipoProducto, 'TipoProducto'), (Mesa, 'Mesa')):
+            with self.subTest(model=model.__name__):
+                catalogo = get_catalog(model)
+                antes = len(catalogo.all())
+
+                instancia = model.objects.create(**{campo: 'Nuevo'})
+                self.assertFalse(catalogo.is_warm())
+                self.assertEqual(catalogo.get_by_name('Nuevo').pk, instancia.pk)
+
+                setattr(instancia, campo, 'Renombrado')
+                instancia.save()
+                self.assertFalse(catalogo.is_warm())
+                self.assertIsNone(catalogo.get_by_name('Nuevo'))
+                self.assertEqual(catalogo.get_data(instancia.pk)[campo], 'Renombrado')
+
+                pk = instancia.pk
+                instancia.delete()
+                self.assertFalse(catalogo.is_warm())
+                self.assertIsNone(catalogo.get(pk))
+                self.assertEqual(len(catalogo.all()), antes)
+
+    def test_lectura_sin_escrituras_no_consulta(self):
+        catalogo = get_catalog(Mesa)
+        catalogo.all()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(catalogo.get(self.mesa.IdMesa).Mesa, self.mesa.Mesa)
+            self.assertTrue(catalogo.is_warm())
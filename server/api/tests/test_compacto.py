@@ -0,0 +1,23 @@
+from .base import KitchonTestCase
+
+
+class CompactoTests(KitchonTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.orden = self.crear_orden()
+
+    def test_list_compacto(self):
+        response = self.client.get('/api/ordenes/?format=compacto')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/vnd.kitchon.compacto+json')
+        self.assertIn('incluidos', response.json())
+
+    def test_otras_acciones_no_ofrecen_compacto(self):
+        for url in (f"/api/ordenes/{self.orden['IdOrden']}/", '/api/ordenes/cocina/', '/api/ordenes/cambios/'):
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_ACCEPT='application/vnd.kitchon.compacto+json')
+                self.assertEqual(response.status_code, 406)
+                self.assertEqual(self.client.get(url + '?format=compacto').status_code, 404)
+                self.assertEqual(self.client.get(url).status_code, 200)
@@ -0,0 +1,81 @@
+from unittest import mock
+
+from api.models import Orden, OrdenEstadoHistorial
+
+from .base import KitchonTestCase
+
+
+class EstadoLoteTests(KitchonTestCase):
+    url = '/api/ordenes/estado/'
+
+    def setUp(self):
+        super().setUp()
+        self.ids = [self.crear_orden()['IdOrden'] for _ in range(4)]
+
+    def patch(self, ids, estado='En Preparación'):
+        return self.client.patch(self.url, {'IdOrdenes': ids, 'IdEstado': self.estados[estado]}, format='json')
+
+    def test_resultados_mixtos(self):
+        ok, entregada, concurrente, _ = self.ids
+        Orden.objects.filter(pk=entregada).update(IdEstado_id=self.estados['Entregado'])
+        siguiente_version = Orden.siguiente_version
+
+        def otra_pantalla(*args, **kwargs):
+            # Otra pantalla cancela la orden entre la lectura y el UPDATE condicional
+            Orden.objects.filter(pk=concurrente).update(IdEstado_id=self.estados['Cancelado'])
+            return siguiente_version(*args, **kwargs)
+
+        with mock.patch.object(Orden, 'siguiente_version', side_effect=otra_pantalla):
+            response = self.patch([ok, 999999, entregada, concurrente])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['cambiadas'], 1)
+        resultados = response.data['resultados']
+        self.assertEqual([resultado['IdOrden'] for resultado in resultados], [ok, 999999, entregada, concurrente])
+        self.assertTrue(resultados[0]['ok'])
+        self.assertEqual(resultados[0]['IdEstado'], self.estados['En Preparación'])
+        self.assertEqual(resultados[1], {'IdOrden': 999999, 'ok': False, 'error': 'Orden no encontrada'})
+        self.assertFalse(resultados[2]['ok'])
+        self.assertEqual(resultados[2]['IdEstado'], self.estados['Entregado'])
+        self.assertIn('Transición no permitida', resultados[2]['error'])
+        self.assertEqual(resultados[3], {
+            'IdOrden': concurrente, 'ok': False, 'error': 'La orden cambió de estado',
+            'IdEstado': self.estados['Cancelado'],
+        })
+        self.assertEqual(list(OrdenEstadoHistorial.objects.values_list('IdOrden', flat=True)), [ok])
+
+    def test_cambiadas_y_versiones(self):
+        response = self.patch(self.ids + self.ids[:1])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['cambiadas'], 4)
+        # Los Ids repetidos cuentan una vez
+        self.assertEqual(len(response.data['resultados']), 4)
+        versiones = [resultado['Version'] for resultado in response.data['resultados']]
+        self.assertEqual(len(set(versiones)), 4)
+        self.assertEqual(
+            set(Orden.objects.values_list('IdEstado', flat=True)), {self.estados['En Preparación']}
+        )
+        self.assertEqual(OrdenEstadoHistorial.objects.count(), 4)
+
+    def test_limite_de_ordenes(self):
+        self.assertEqual(self.patch(list(range(1, 202))).status_code, 400)
+
+        response = self.patch(list(range(1, 201)))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['resultados']), 200)
+
+    def test_peticion_invalida(self):
+        listo = self.estados['Listo']
+        for data in (
+            {'IdOrdenes': self.ids},
+            {'IdOrdenes': [], 'IdEstado': listo},
+            {'IdOrdenes': 'x', 'IdEstado': listo},
+            {'IdOrdenes': ['a'], 'IdEstado': listo},
+        ):
+            with self.subTest(data=data):
+                self.assertEqual(self.client.patch(self.url, data, format='json').status_code, 400)
+
+        response = self.client.patch(self.url, {'IdOrdenes': self.ids, 'IdEstado': 999}, format='json')
+        self.assertEqual(response.status_code, 404)
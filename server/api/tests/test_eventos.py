@@ -0,0 +1,121 @@
+import asyncio
+import threading
+from unittest import mock
+
+from django.db import transaction
+
+from api import events
+from api.tokens import RevocableRefreshToken
+from api.websocket import CLOSE_NOT_FOUND, CLOSE_UNAUTHORIZED, ordenes_websocket
+
+from .base import KitchonTestCase
+
+
+class PublicarTests(KitchonTestCase):
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(events, 'get_broker')
+        self.broker = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+    def test_se_publica_al_confirmar(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            data = self.crear_orden()
+            self.broker.publish.assert_not_called()
+
+        for callback in callbacks:
+            callback()
+        evento, = [llamada.args[0] for llamada in self.broker.publish.call_args_list]
+        self.assertEqual(evento['type'], events.ORDEN_CREADA)
+        self.assertEqual(evento['orden']['IdOrden'], data['IdOrden'])
+        # Mismo formato de fecha que la respuesta REST
+        self.assertEqual(evento['orden']['FechaCreacion'], data['FechaCreacion'])
+        self.assertEqual(len(evento['orden']['Productos']), 2)
+
+    def test_no_se_publica_si_se_deshace(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                events.publish({'type': events.ORDEN_ESTADO})
+                raise RuntimeError
+
+        self.broker.publish.assert_not_called()
+
+
+class InProcessBrokerTests(KitchonTestCase):
+
+    def test_reparte_a_los_suscriptores(self):
+        broker = events.InProcessBroker(max_queue=2)
+
+        async def escuchar():
+            async with broker.subscribe() as primera, broker.subscribe() as segunda:
+                # Se publica desde otro hilo, como lo hace un worker WSGI
+                hilo = threading.Thread(target=lambda: [broker.publish({'n': n}) for n in range(3)])
+                hilo.start()
+                hilo.join()
+                await asyncio.sleep(0)
+                recibidos = [await primera.get(), await primera.get(), await segunda.get()]
+            return recibidos, len(broker._subscriptions)
+
+        recibidos, suscripciones = asyncio.run(escuchar())
+
+        # Cola de 2: el evento más antiguo se descarta
+        self.assertEqual(recibidos, [{'n': 1}, {'n': 2}, {'n': 1}])
+        self.assertEqual(suscripciones, 0)
+
+
+class WebSocketTests(KitchonTestCase):
+
+    def conectar(self, query_string=b'', path='/ws/ordenes/', eventos=()):
+        enviados = []
+
+        async def conversar():
+            mensajes = asyncio.Queue()
+            await mensajes.put({'type': 'websocket.connect'})
+
+            async def publicar():
+                # Después del accept el canal se suscribe al broker
+                await asyncio.sleep(0.01)
+                for evento in eventos:
+                    events.get_broker().publish(evento)
+                await asyncio.sleep(0.05)
+                await mensajes.put({'type': 'websocket.disconnect'})
+
+            async def send(message):
+                enviados.append(message)
+                if message['type'] == 'websocket.accept':
+                    tareas.append(asyncio.ensure_future(publicar()))
+
+            tareas = []
+
+            scope = {'type': 'websocket', 'path': path, 'query_string': query_string}
+            await asyncio.wait_for(ordenes_websocket(scope, mensajes.get, send), timeout=5)
+            await asyncio.gather(*tareas)
+
+        asyncio.run(conversar())
+        return enviados
+
+    def test_token_invalido(self):
+        for query_string in (b'', b'token=', b'token=no-es-un-jwt'):
+            with self.subTest(query_string=query_string):
+                self.assertEqual(
+                    self.conectar(query_string), [{'type': 'websocket.close', 'code': CLOSE_UNAUTHORIZED}]
+                )
+
+    def test_refresh_token_no_sirve(self):
+        refresh = RevocableRefreshToken.for_usuario(self.admin)
+        enviados = self.conectar(f'token={refresh}'.encode())
+        self.assertEqual(enviados, [{'type': 'websocket.close', 'code': CLOSE_UNAUTHORIZED}])
+
+    def test_ruta_desconocida(self):
+        enviados = self.conectar(path='/ws/otra/')
+        self.assertEqual(enviados, [{'type': 'websocket.close', 'code': CLOSE_NOT_FOUND}])
+
+    def test_recibe_eventos(self):
+        token = RevocableRefreshToken.for_usuario(self.admin).access_token
+        enviados = self.conectar(f'token={token}'.encode(), eventos=[{'type': events.ORDEN_ESTADO}])
+
+        self.assertEqual(enviados, [
+            {'type': 'websocket.accept'},
+            {'type': 'websocket.send', 'text': '{"type": "orden.estado"}'},
+        ])
@@ -0,0 +1,80 @@
+from decimal import Decimal
+
+from rest_framework.renderers import JSONRenderer
+
+from api.fast_serializers import OrdenFastSerializer, ProductoFastSerializer, UsuarioFastSerializer
+from api.cache import menu_cache
+from api.models import Orden, Persona, ProductoOrden, Usuario
+from api.serializers import OrdenSerializer, ProductoSerializer, UsuarioSerializer
+from api.views import OrdenViewSet, ProductoViewSet, UsuarioViewSet
+
+from .base import KitchonTestCase
+
+
+class FastSerializerTests(KitchonTestCase):
+    """El JSON de los serializers rápidos debe ser idéntico, byte a byte, al de DRF."""
+
+    def assertMismoJSON(self, fast_class, drf_class, queryset):
+        instancias = list(queryset)
+        self.assertTrue(instancias)
+        renderer = JSONRenderer()
+        self.assertEqual(
+            renderer.render(fast_class(instancias, many=True).data),
+            renderer.render(drf_class(instancias, many=True).data),
+        )
+        self.assertEqual(
+            renderer.render(fast_class(instancias[0]).data),
+            renderer.render(drf_class(instancias[0]).data),
+        )
+
+    def test_producto(self):
+        producto = self.productos[0]
+        producto.Valor = Decimal('12.50')
+        producto.save()
+
+        self.assertMismoJSON(ProductoFastSerializer, ProductoSerializer, ProductoViewSet.queryset.all())
+
+    def test_usuario(self):
+        # Persona con los campos opcionales vacíos y con valor
+        Usuario.objects.create(
+            IdPersona=Persona.objects.create(PrimerNombre='Ana', PrimerApellido='Ruiz'),
+            IdTipoUsuario=self.admin.IdTipoUsuario, Username='ana', Password='x', IdEstado_id=self.estados['Activo'],
+        )
+        Usuario.objects.create(
+            IdPersona=Persona.objects.create(
+                PrimerNombre='Luis', SegundoNombre='Ñandú', PrimerApellido='Pérez', SegundoApellido='',
+            ),
+            IdTipoUsuario=self.admin.IdTipoUsuario, Username='luis', Password='x', IdEstado_id=self.estados['Inactivo'],
+        )
+
+        self.assertMismoJSON(UsuarioFastSerializer, UsuarioSerializer, UsuarioViewSet.queryset.all())
+
+    def test_orden(self):
+        self.crear_orden(Productos=[
+            {'IdProducto': self.productos[0].IdProducto, 'Cantidad': 3},
+            {'IdProducto': self.productos[1].IdProducto, 'Notas': ''},
+            {'IdProducto': self.productos[2].IdProducto, 'Notas': 'sin "sal"'},
+        ])
+        self.crear_orden()
+        # Orden sin productos
+        sin_lineas = self.crear_orden()
+        ProductoOrden.objects.filter(IdOrden=sin_lineas['IdOrden']).delete()
+        self.assertTrue(ProductoOrden.objects.filter(Notas__isnull=True).exists())
+
+        self.assertMismoJSON(
+            OrdenFastSerializer, OrdenSerializer, OrdenViewSet.queryset.order_by('-FechaCreacion', '-IdOrden')
+        )
+        self.assertEqual(Orden.objects.count(), 3)
+
+    def test_endpoints(self):
+        self.crear_orden()
+        menu_cache.clear()
+        for url in ('/api/ordenes/', '/api/productos/', '/api/usuarios/'):
+            with self.subTest(url=url):
+                with self.settings(FAST_SERIALIZERS=[]):
+                    drf = self.client.get(url).content
+                # El menú guarda el cuerpo ya renderizado
+                menu_cache.clear()
+                with self.settings(FAST_SERIALIZERS=['orden', 'producto', 'usuario']):
+                    fast = self.client.get(url).content
+                self.assertEqual(fast, drf)
@@ -0,0 +1,61 @@
+import threading
+from unittest import mock
+
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+
+from api import health
+
+
+@override_settings(HEALTH_CHECK_TIMEOUT=0.2)
+class ReadinessTests(SimpleTestCase):
+    # Los chequeos abren su propia conexión en otro hilo
+    databases = {'default'}
+
+    def setUp(self):
+        health._en_curso.clear()
+
+    def test_chequeo_colgado_no_bloquea_los_siguientes(self):
+        liberar = threading.Event()
+        checks = {'db': lambda: liberar.wait() and {}, 'cache': lambda: {}}
+
+        with mock.patch.dict(health.CHECKS, checks, clear=True):
+            primero = health._ejecutar()
+            # El hilo colgado sigue vivo: no se lanza otro, se reporta de inmediato
+            segundo = health._ejecutar()
+            liberar.set()
+            health._en_curso['db'].result(timeout=1)
+            tercero = health._ejecutar()
+
+        self.assertEqual(primero['checks']['db'], {'ok': False, 'error': 'Sin respuesta en 0.2s'})
+        self.assertFalse(segundo['checks']['db']['ok'])
+        self.assertLess(segundo['duracion_ms'], 100)
+        self.assertEqual(tercero['status'], 'ready')
+
+    def test_migraciones_al_dia(self):
+        health._migraciones, health._migraciones_aplicadas = None, False
+        checks = {'migraciones': health._check_migraciones}
+
+        with mock.patch.dict(health.CHECKS, checks, clear=True), \
+                mock.patch.object(health, 'MigrationLoader', wraps=health.MigrationLoader) as loader:
+            resultados = [health._ejecutar() for _ in range(3)]
+
+        self.assertEqual([resultado['status'] for resultado in resultados], ['ready'] * 3)
+        # El grafo de migraciones se carga una sola vez por proceso
+        self.assertEqual(loader.call_count, 1)
+
+    def test_chequeo_db_no_deja_statement_timeout(self):
+        if connection.vendor != 'postgresql':
+            self.skipTest('statement_timeout es de PostgreSQL')
+        with connection.cursor() as cursor:
+            cursor.execute('SHOW statement_timeout')
+            antes = cursor.fetchone()
+
+        # Con DB_POOL_MAX_SIZE la conexión vuelve al pool en lugar de cerrarse y
+        # la reutiliza otra petición: aquí se sigue usando la misma
+        with mock.patch.object(connection, 'close'):
+            self.assertEqual(health._check_db(), {})
+
+        with connection.cursor() as cursor:
+            cursor.execute('SHOW statement_timeout')
+            self.assertEqual(cursor.fetchone(), antes)
@@ -0,0 +1,43 @@
+from api import idempotencia
+from api.models import Orden, OrdenIdempotencia
+
+from .base import KitchonTestCase
+
+
+class IdempotenciaTests(KitchonTestCase):
+
+    def setUp(self):
+        super().setUp()
+        idempotencia.recientes.clear()
+
+    def post(self, data, clave='tablet-1'):
+        return self.client.post('/api/ordenes/', data, format='json', HTTP_IDEMPOTENCY_KEY=clave)
+
+    def test_reintento_repite_la_respuesta(self):
+        primera = self.post(self.orden_data())
+        segunda = self.post(self.orden_data())
+
+        self.assertEqual(primera.status_code, 201)
+        self.assertEqual(segunda.status_code, 201)
+        self.assertEqual(segunda['Idempotent-Replayed'], 'true')
+        self.assertEqual(segunda.json(), primera.json())
+        self.assertEqual(Orden.objects.count(), 1)
+
+    def test_reintento_sin_lru_consulta_la_tabla(self):
+        primera = self.post(self.orden_data())
+        idempotencia.recientes.clear()
+
+        segunda = self.post(self.orden_data())
+
+        self.assertEqual(segunda.status_code, 201)
+        self.assertEqual(segunda.json(), primera.json())
+        self.assertEqual(Orden.objects.count(), 1)
+
+    def test_misma_clave_con_otro_cuerpo(self):
+        self.post(self.orden_data())
+
+        response = self.post(self.orden_data(IdEstado=self.estados['En Preparación']))
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Orden.objects.count(), 1)
+        self.assertEqual(OrdenIdempotencia.objects.count(), 1)
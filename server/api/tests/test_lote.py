@@ -0,0 +1,81 @@
+from api import idempotencia
+from api.models import Orden, ProductoOrden
+
+from .base import KitchonTestCase
+
+
+class LoteTests(KitchonTestCase):
+    url = '/api/ordenes/lote/'
+
+    def setUp(self):
+        super().setUp()
+        idempotencia.recientes.clear()
+
+    def post(self, ordenes):
+        return self.client.post(self.url, {'Ordenes': ordenes}, format='json')
+
+    def test_errores_por_orden(self):
+        response = self.post([
+            self.orden_data(),
+            self.orden_data(IdMesa=999999),
+            {'IdMesa': 'x'},
+            self.orden_data(Productos=[{'IdProducto': 999999}]),
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['creadas'], 1)
+        ok, mesa, invalida, producto = response.data['resultados']
+        self.assertEqual((ok['indice'], ok['ok']), (0, True))
+        self.assertEqual(Orden.objects.get().IdOrden, ok['orden']['IdOrden'])
+        self.assertEqual(mesa, {'indice': 1, 'ok': False, 'errores': {'IdMesa': 'Mesa no encontrada'}})
+        self.assertFalse(invalida['ok'])
+        self.assertIn('IdEstado', invalida['errores'])
+        self.assertEqual(producto['errores'], {'Productos': 'Productos no encontrados: [999999]'})
+
+    def test_clave_repetida_en_el_lote(self):
+        response = self.post([
+            self.orden_data(Clave='a'),
+            self.orden_data(Clave='b'),
+            self.orden_data(Clave='a'),
+            self.orden_data(Clave='a', IdMesa=999999),
+        ])
+
+        self.assertEqual(response.data['creadas'], 2)
+        self.assertEqual([resultado['ok'] for resultado in response.data['resultados']], [True, True, False, False])
+        for resultado in response.data['resultados'][2:]:
+            self.assertEqual(resultado['errores'], {'Clave': 'Clave repetida en el lote'})
+
+    def test_reenviar_el_lote(self):
+        lote = [self.orden_data(Clave='a'), self.orden_data(Clave='b'), self.orden_data()]
+        primera = self.post(lote)
+        filas = (Orden.objects.count(), ProductoOrden.objects.count())
+
+        segunda = self.post(lote[:2])
+
+        self.assertEqual(segunda.status_code, 200)
+        self.assertEqual(segunda.data['creadas'], 0)
+        self.assertEqual([resultado.get('repetida') for resultado in segunda.data['resultados']], [True, True])
+        self.assertEqual(
+            [resultado['orden'] for resultado in segunda.data['resultados']],
+            [resultado['orden'] for resultado in primera.data['resultados'][:2]],
+        )
+        self.assertEqual((Orden.objects.count(), ProductoOrden.objects.count()), filas)
+
+    def test_clave_con_otra_orden(self):
+        self.post([self.orden_data(Clave='a')])
+
+        response = self.post([self.orden_data(Clave='a', IdEstado=self.estados['En Preparación'])])
+
+        self.assertEqual(response.data['resultados'][0]['errores'], {'Clave': 'La clave ya se usó con otra orden'})
+        self.assertEqual(Orden.objects.count(), 1)
+
+    def test_limite_de_ordenes(self):
+        self.assertEqual(self.post([self.orden_data()] * 101).status_code, 400)
+        self.assertEqual(self.post([]).status_code, 400)
+        self.assertFalse(Orden.objects.exists())
+
+        response = self.post([self.orden_data()] * 100)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['creadas'], 100)
+        self.assertEqual(Orden.objects.count(), 100)
@@ -0,0 +1,36 @@
+from api import metrics
+
+from .base import KitchonTestCase
+
+
+class ServerTimingTests(KitchonTestCase):
+
+    def test_cabecera_separa_db_y_app(self):
+        response = self.client.get('/api/ordenes/')
+
+        partes = [parte.split(';')[0].strip() for parte in response['Server-Timing'].split(',')]
+        self.assertEqual(partes, ['db', 'app', 'total'])
+
+    def test_consultas_del_cuerpo_por_partes(self):
+        self.crear_orden()
+        antes = metrics.routes().get('reportes.ventas')
+        antes = antes.consultas.sum if antes else 0
+
+        response = self.client.get('/api/reportes/ventas/?agrupar=producto')
+        cabecera = int(response['Server-Timing'].split('desc="')[1].split('"')[0])
+        b''.join(response.streaming_content)
+
+        # La fila de cada grupo se lee mientras se envía el cuerpo, después de la cabecera
+        self.assertGreater(metrics.routes()['reportes.ventas'].consultas.sum - antes, cabecera)
+
+
+class PrometheusTests(KitchonTestCase):
+
+    def test_tipos(self):
+        texto = metrics.prometheus({'mesa': {'hits': 3, 'misses': 1, 'hit_ratio': 0.75}})
+
+        tipos = dict(linea.split()[2:] for linea in texto.splitlines() if linea.startswith('# TYPE'))
+        self.assertEqual(tipos['kitchon_cache_hit_ratio'], 'gauge')
+        self.assertEqual(tipos['kitchon_cache_hits_total'], 'counter')
+        self.assertEqual(tipos['kitchon_http_request_duration_seconds'], 'histogram')
+        self.assertIn('kitchon_cache_hit_ratio{cache="mesa"} 0.75', texto.splitlines())
@@ -0,0 +1,149 @@
+from unittest import mock
+
+from django.db import DatabaseError
+
+from api.models import Orden, OrdenEstadoHistorial, ProductoOrden
+from api.views import OrdenViewSet
+
+from .base import KitchonTestCase
+
+
+class CrearOrdenTests(KitchonTestCase):
+
+    def test_crea_orden_con_productos(self):
+        data = self.crear_orden()
+
+        orden = Orden.objects.get(pk=data['IdOrden'])
+        self.assertEqual(orden.IdEstado_id, self.estados['Pendiente'])
+        self.assertEqual(orden.Version, data['Version'])
+        lineas = dict(ProductoOrden.objects.filter(IdOrden=orden).values_list('IdProducto', 'Cantidad'))
+        self.assertEqual(lineas, {self.productos[0].IdProducto: 2, self.productos[1].IdProducto: 1})
+        self.assertEqual(len(data['ProductosOrden']), 2)
+
+    def test_versiones_crecientes(self):
+        primera = self.crear_orden()
+        segunda = self.crear_orden()
+        self.assertGreater(segunda['Version'], primera['Version'])
+
+    def test_referencia_invalida_no_crea_nada(self):
+        data = self.orden_data(Productos=[{'IdProducto': self.productos[0].IdProducto}, {'IdProducto': 999999}])
+        response = self.client.post('/api/ordenes/', data, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Orden.objects.exists())
+
+    def test_falla_al_insertar_lineas_no_deja_orden(self):
+        with mock.patch.object(ProductoOrden.objects, 'bulk_create', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.client.post('/api/ordenes/', self.orden_data(), format='json')
+
+        self.assertFalse(Orden.objects.exists())
+        self.assertFalse(ProductoOrden.objects.exists())
+
+
+class CambiarEstadoTests(KitchonTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.orden = self.crear_orden()
+        self.url = f"/api/ordenes/{self.orden['IdOrden']}/estado/"
+
+    def test_cambio_permitido(self):
+        response = self.client.patch(self.url, {'IdEstado': self.estados['En Preparación']}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['IdEstado'], self.estados['En Preparación'])
+        self.assertGreater(response.data['Version'], self.orden['Version'])
+        historial = OrdenEstadoHistorial.objects.get(IdOrden=self.orden['IdOrden'])
+        self.assertEqual(historial.IdEstadoAnterior_id, self.estados['Pendiente'])
+        self.assertEqual(historial.Version, response.data['Version'])
+
+    def test_transicion_no_permitida(self):
+        response = self.client.patch(self.url, {'IdEstado': self.estados['Entregado']}, format='json')
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['IdEstado'], self.estados['Pendiente'])
+        self.assertEqual(Orden.objects.get(pk=self.orden['IdOrden']).IdEstado_id, self.estados['Pendiente'])
+
+    def test_estado_actual_desactualizado(self):
+        self.client.patch(self.url, {'IdEstado': self.estados['En Preparación']}, format='json')
+
+        response = self.client.patch(self.url, {
+            'IdEstado': self.estados['Cancelado'], 'IdEstadoActual': self.estados['Pendiente'],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['IdEstado'], self.estados['En Preparación'])
+        self.assertEqual(OrdenEstadoHistorial.objects.filter(IdOrden=self.orden['IdOrden']).count(), 1)
+
+    def test_update_general_con_lectura_vieja(self):
+        vieja = Orden.objects.get(pk=self.orden['IdOrden'])
+        self.client.patch(self.url, {'IdEstado': self.estados['En Preparación']}, format='json')
+
+        # La orden se leyó antes del cambio anterior: el UPDATE condicional no debe sobrescribirlo
+        with mock.patch.object(OrdenViewSet, 'get_object', return_value=vieja):
+            response = self.client.patch(
+                f"/api/ordenes/{self.orden['IdOrden']}/", {'IdEstado': self.estados['Cancelado']}, format='json'
+            )
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Orden.objects.get(pk=self.orden['IdOrden']).IdEstado_id, self.estados['En Preparación'])
+
+    def test_orden_inexistente(self):
+        response = self.client.patch('/api/ordenes/999999/estado/', {'IdEstado': self.estados['Listo']}, format='json')
+        self.assertEqual(response.status_code, 404)
+
+
+class VersionTests(KitchonTestCase):
+
+    def test_version_no_se_puede_escribir(self):
+        orden = self.crear_orden()
+
+        response = self.client.patch(f"/api/ordenes/{orden['IdOrden']}/", {'Version': 1}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(response.data['Version'], orden['Version'])
+        self.assertEqual(Orden.objects.get(pk=orden['IdOrden']).Version, response.data['Version'])
+
+
+@mock.patch('api.events.get_broker')
+class EventosUpdateTests(KitchonTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.orden = self.crear_orden()
+        self.url = f"/api/ordenes/{self.orden['IdOrden']}/"
+
+    def eventos(self, broker):
+        return [llamada.args[0] for llamada in broker.return_value.publish.call_args_list]
+
+    def test_update_con_cambio_de_estado(self, broker):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(self.url, {'IdEstado': self.estados['En Preparación']}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.eventos(broker), [{
+            'type': 'orden.estado',
+            'orden': {
+                'IdOrden': self.orden['IdOrden'],
+                'IdEstado': self.estados['En Preparación'],
+                'Version': response.data['Version'],
+            },
+        }])
+
+    def test_update_sin_cambio_de_estado(self, broker):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(self.url, {'IdMesa': self.mesa.IdMesa}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.eventos(broker), [])
+
+    def test_eliminar(self, broker):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(self.url)
+
+        self.assertEqual(response.status_code, 204)
+        evento, = self.eventos(broker)
+        self.assertEqual(evento['type'], 'orden.eliminada')
+        self.assertEqual(evento['orden']['IdOrden'], self.orden['IdOrden'])
+        self.assertGreater(evento['orden']['Version'], self.orden['Version'])
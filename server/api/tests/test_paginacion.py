@@ -0,0 +1,40 @@
+from api.models import Orden
+
+from .base import KitchonTestCase
+
+
+class PaginacionTests(KitchonTestCase):
+
+    def test_paginas_sin_repetidos_ni_huecos(self):
+        ids = [self.crear_orden()['IdOrden'] for _ in range(8)]
+        # Fechas iguales en parte de las órdenes: el desempate es IdOrden
+        Orden.objects.filter(IdOrden__in=ids[2:6]).update(FechaCreacion=Orden.objects.get(pk=ids[2]).FechaCreacion)
+
+        vistos = []
+        url = '/api/ordenes/?page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), 3)
+            vistos.extend(orden['IdOrden'] for orden in response.data['results'])
+            url = response.data['next']
+
+        esperados = list(Orden.objects.order_by('-FechaCreacion', '-IdOrden').values_list('IdOrden', flat=True))
+        self.assertEqual(vistos, esperados)
+        self.assertEqual(sorted(vistos), sorted(ids))
+
+    def test_orden_nueva_no_desplaza_la_pagina_siguiente(self):
+        for _ in range(4):
+            self.crear_orden()
+        primera = self.client.get('/api/ordenes/?page_size=2').data
+
+        self.crear_orden()
+        segunda = self.client.get(primera['next']).data
+
+        vistos = [orden['IdOrden'] for orden in primera['results'] + segunda['results']]
+        self.assertEqual(len(set(vistos)), 4)
+        self.assertEqual(vistos, sorted(vistos, reverse=True))
+
+    def test_cursor_invalido(self):
+        response = self.client.get('/api/ordenes/?cursor=no-es-un-cursor')
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,76 @@
+import threading
+from unittest import mock
+
+from django.test import override_settings
+
+from api import passwords
+from api.models import Persona, Usuario
+
+from .base import KitchonTestCase
+
+
+@override_settings(BCRYPT_ROUNDS=4)
+class LoginTests(KitchonTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.credentials()
+        # Un solo hilo y sin cola: la segunda solicitud simultánea ya no cabe
+        self.pool = passwords.BcryptPool(1, 0)
+        patcher = mock.patch.object(passwords, '_pool', self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.usuario = Usuario(
+            IdPersona=Persona.objects.create(PrimerNombre='Ana', PrimerApellido='Ruiz'),
+            IdTipoUsuario=self.admin.IdTipoUsuario, Username='ana', IdEstado_id=self.estados['Activo'],
+        )
+        self.usuario.set_password('secreta')
+        self.usuario.save()
+
+    def login(self, password='secreta'):
+        return self.client.post('/api/auth/login/', {'username': 'ana', 'password': password}, format='json')
+
+    def test_login(self):
+        self.assertEqual(self.login().status_code, 200)
+        self.assertEqual(self.login('otra').status_code, 401)
+
+    def test_pool_saturado(self):
+        ocupado, liberar = threading.Event(), threading.Event()
+
+        def bloquear():
+            ocupado.set()
+            liberar.wait(5)
+
+        hilo = threading.Thread(target=self.pool.run, args=(bloquear,))
+        hilo.start()
+        try:
+            ocupado.wait(5)
+            response = self.login()
+        finally:
+            liberar.set()
+            hilo.join()
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '1')
+        # Con el pool libre el mismo login funciona
+        self.assertEqual(self.login().status_code, 200)
+
+    def test_rehash_al_cambiar_el_costo(self):
+        self.assertFalse(self.usuario.password_needs_rehash())
+
+        with self.settings(BCRYPT_ROUNDS=5):
+            self.assertEqual(self.login().status_code, 200)
+
+        self.usuario.refresh_from_db()
+        self.assertTrue(self.usuario.Password.startswith('$2b$05$'))
+        with self.settings(BCRYPT_ROUNDS=5):
+            self.assertFalse(self.usuario.password_needs_rehash())
+            self.assertEqual(self.login().status_code, 200)
+
+    def test_sin_rehash_si_el_costo_no_cambia(self):
+        anterior = self.usuario.Password
+
+        self.assertEqual(self.login().status_code, 200)
+
+        self.usuario.refresh_from_db()
+        self.assertEqual(self.usuario.Password, anterior)
@@ -0,0 +1,41 @@
+from api.cache import menu_cache
+
+from .base import KitchonTestCase
+
+
+class MenuTests(KitchonTestCase):
+
+    def setUp(self):
+        super().setUp()
+        menu_cache.clear()
+
+    def test_get_condicional(self):
+        response = self.client.get('/api/productos/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ETag', response)
+
+        response = self.client.get('/api/productos/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_cambio_en_el_menu_cambia_el_etag(self):
+        etag = self.client.get('/api/productos/')['ETag']
+        self.productos[0].NombreProducto = 'Otro nombre'
+        self.productos[0].save()
+
+        response = self.client.get('/api/productos/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        nombres = [producto['NombreProducto'] for producto in response.json()['results']]
+        self.assertIn('Otro nombre', nombres)
+
+    def test_api_navegable_no_se_guarda(self):
+        response = self.client.get('/api/productos/', HTTP_ACCEPT='text/html')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/html'))
+        self.assertNotIn('ETag', response)
+        self.assertEqual(self.client.get('/api/productos/?format=api').status_code, 200)
+        self.assertEqual(menu_cache.stats()['version'], None)
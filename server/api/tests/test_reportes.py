@@ -0,0 +1,17 @@
+from .base import KitchonTestCase
+
+
+class RangoFechasTests(KitchonTestCase):
+
+    def test_fechas_invalidas(self):
+        for consulta in ('desde=foo', 'hasta=2026-02-30', 'desde=', 'desde=2026-10-10&hasta=2026-10-01'):
+            for ruta in ('resumen', 'por_hora', 'ventas'):
+                with self.subTest(ruta=ruta, consulta=consulta):
+                    response = self.client.get(f'/api/reportes/{ruta}/?{consulta}')
+                    self.assertEqual(response.status_code, 400)
+
+    def test_rango_por_defecto(self):
+        response = self.client.get('/api/reportes/resumen/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['hasta'] - response.data['desde']).days, 6)
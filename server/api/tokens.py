@@ -0,0 +1,56 @@
+from datetime import datetime, timezone
+
+from django.db import IntegrityError, transaction
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import TokenRevocado
+
+
+class RevocableRefreshToken(RefreshToken):
+    """
+    Refresh token de un solo uso con revocación en ``TokenRevocado``.
+
+    No usa la app ``token_blacklist`` de simplejwt porque esta guarda cada
+    token emitido y lo asocia al modelo de usuario de Django; aquí solo se
+    guarda el jti de los tokens ya usados o cerrados, hasta que expiran.
+    """
+    # Claims del usuario que se copian al rotar el token
+    user_claims = ('IdUsuario', 'Username', 'IdTipoUsuario')
+
+    @classmethod
+    def for_usuario(cls, usuario):
+        token = cls()
+        token['IdUsuario'] = usuario.IdUsuario
+        token['Username'] = usuario.Username
+        token['IdTipoUsuario'] = usuario.IdTipoUsuario_id
+        return token
+
+    def revoke(self):
+        """
+        Revoca el token; lanza TokenError si ya estaba revocado.
+
+        El INSERT sobre la PK es a la vez la verificación y la revocación, así
+        dos solicitudes simultáneas con el mismo token no pueden rotarlo ambas.
+        """
+        expira = datetime.fromtimestamp(self['exp'], tz=timezone.utc)
+        try:
+            with transaction.atomic():
+                TokenRevocado.objects.create(Jti=self[api_settings.JTI_CLAIM], Expira=expira)
+        except IntegrityError:
+            raise TokenError('Token revocado')
+
+    def rotate(self):
+        """Revoca este token y retorna uno nuevo con los mismos claims de usuario."""
+        self.revoke()
+        token = type(self)()
+        for claim in self.user_claims:
+            token[claim] = self[claim]
+        return token
+
+
+def prune_revocados(now=None):
+    """Elimina los jti de tokens que ya expiraron; retorna cuántos se borraron."""
+    deleted, _ = TokenRevocado.objects.filter(Expira__lt=now or datetime.now(timezone.utc)).delete()
+    return deleted
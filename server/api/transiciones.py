@@ -0,0 +1,179 @@
+"""
+Máquina de estados de las órdenes y cambio de estado atómico.
+
+Un cambio de estado es un UPDATE condicional (compare-and-set):
+``UPDATE orden SET IdEstado = nuevo ... WHERE IdOrden = x AND IdEstado = esperado``.
+Si otra pantalla cambió la orden primero, el UPDATE no afecta filas y se
+reporta un conflicto (409) en lugar de sobrescribir el cambio.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, Value, When
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from . import metrics
+from .cache import get_catalog
+from .models import Estado, Orden, OrdenEstadoHistorial
+
+
+# Transiciones permitidas por nombre de estado; Entregado y Cancelado son finales.
+TRANSICIONES = {
+    'Pendiente': ('En Preparación', 'Cancelado'),
+    'En Preparación': ('Listo', 'Cancelado'),
+    'Listo': ('Entregado', 'Cancelado'),
+}
+
+
+class ConflictoEstado(APIException):
+    """La orden no está en el estado esperado; ``IdEstado`` es el estado actual."""
+    status_code = status.HTTP_409_CONFLICT
+    default_code = 'conflict'
+
+    def __init__(self, mensaje, id_estado_actual):
+        super().__init__(mensaje)
+        # Cuerpo tal cual (APIException convertiría el Id a texto)
+        self.detail = {'error': mensaje, 'IdEstado': id_estado_actual}
+
+
+_tabla = (None, {})
+
+
+def permitidas():
+    """``{IdEstado: frozenset(IdEstado siguientes)}``; se recalcula solo si cambia el catálogo de estados."""
+    global _tabla
+    estados = get_catalog(Estado)
+    version, tabla = _tabla
+    if version != estados.version:
+        tabla = {}
+        for desde, hacia in TRANSICIONES.items():
+            estado = estados.get_by_name(desde)
+            if estado is not None:
+                tabla[estado.IdEstado] = frozenset(
+                    siguiente.IdEstado for siguiente in map(estados.get_by_name, hacia) if siguiente is not None
+                )
+        _tabla = (estados.version, tabla)
+    return tabla
+
+
+def validar_transicion(id_desde, estado):
+    """Lanza ``ConflictoEstado`` si la máquina de estados no permite pasar de ``id_desde`` a ``estado``."""
+    if estado.IdEstado not in permitidas().get(id_desde, ()):
+        desde = get_catalog(Estado).get(id_desde)
+        raise ConflictoEstado(f'Transición no permitida: {desde} -> {estado}', id_desde)
+
+
+def cambiar_estado(id_orden, estado, id_esperado=None, id_usuario=None):
+    """
+    Pasa la orden a ``estado`` si está en ``id_esperado`` (por defecto, el
+    estado que tiene al leerla) y retorna la orden con solo Id, estado,
+    versión y fecha del cambio. Lanza ``Orden.DoesNotExist`` o ``ConflictoEstado``.
+    """
+    actual = Orden.objects.filter(pk=id_orden).values_list('IdEstado', 'FechaEstado').first()
+    if actual is None:
+        raise Orden.DoesNotExist()
+    id_actual, desde = actual
+    if id_esperado is not None and id_esperado != id_actual:
+        raise ConflictoEstado('La orden cambió de estado', id_actual)
+    id_esperado = id_actual
+    validar_transicion(id_esperado, estado)
+
+    orden = Orden(IdOrden=id_orden, IdEstado=estado, FechaEstado=timezone.now())
+    anterior = get_catalog(Estado).get(id_esperado)
+    try:
+        with transaction.atomic():
+            orden.Version = Orden.siguiente_version()
+            actualizadas = Orden.objects.filter(pk=id_orden, IdEstado=id_esperado).update(
+                IdEstado=estado, Version=orden.Version, FechaEstado=orden.FechaEstado
+            )
+            if not actualizadas:
+                raise ConflictoEstado('La orden cambió de estado', None)
+            OrdenEstadoHistorial.registrar(orden, anterior, desde, id_usuario)
+    except ConflictoEstado:
+        # Se deshizo la versión; reportar el estado con que quedó (o que ya no existe)
+        id_actual = Orden.objects.filter(pk=id_orden).values_list('IdEstado', flat=True).first()
+        if id_actual is None:
+            raise Orden.DoesNotExist()
+        raise ConflictoEstado('La orden cambió de estado', id_actual)
+
+    metrics.record_cambio_estado(anterior, estado, desde, orden.FechaEstado)
+    return orden
+
+
+def cambiar_estado_lote(ids_orden, estado, id_usuario=None):
+    """
+    Pasa varias órdenes a ``estado`` en una transacción, con un UPDATE
+    condicional por cada estado de origen. Retorna ``(cambiadas, resultados)``:
+    las órdenes cambiadas (como en ``cambiar_estado``) y un resultado por Id,
+    en el orden recibido.
+    """
+    actuales = {
+        id_orden: (id_estado, desde)
+        for id_orden, id_estado, desde in Orden.objects.filter(pk__in=ids_orden).values_list(
+            'IdOrden', 'IdEstado', 'FechaEstado'
+        )
+    }
+    tabla = permitidas()
+    resultados = {}
+    por_estado = defaultdict(list)
+    for id_orden in ids_orden:
+        if id_orden not in actuales:
+            resultados[id_orden] = {'IdOrden': id_orden, 'ok': False, 'error': 'Orden no encontrada'}
+        elif estado.IdEstado not in tabla.get(actuales[id_orden][0], ()):
+            id_actual = actuales[id_orden][0]
+            desde = get_catalog(Estado).get(id_actual)
+            resultados[id_orden] = {
+                'IdOrden': id_orden, 'ok': False,
+                'error': f'Transición no permitida: {desde} -> {estado}', 'IdEstado': id_actual,
+            }
+        else:
+            por_estado[actuales[id_orden][0]].append(id_orden)
+
+    cambiadas = []
+    candidatas = sorted(id_orden for ids in por_estado.values() for id_orden in ids)
+    if candidatas:
+        ahora = timezone.now()
+        with transaction.atomic():
+            # Una versión por orden (``cambios`` pagina por Version), reservadas de una vez
+            ultima = Orden.siguiente_version(len(candidatas))
+            versiones = dict(zip(candidatas, range(ultima - len(candidatas) + 1, ultima + 1)))
+            for id_desde, ids in por_estado.items():
+                actualizadas = Orden.objects.filter(pk__in=ids, IdEstado=id_desde).update(
+                    IdEstado=estado, FechaEstado=ahora,
+                    Version=Case(*(When(IdOrden=id_orden, then=Value(versiones[id_orden])) for id_orden in ids)),
+                )
+                if actualizadas < len(ids):
+                    # Otra pantalla cambió alguna: solo quedan las que recibieron su versión
+                    ids = set(Orden.objects.filter(
+                        pk__in=ids, Version__in=[versiones[id_orden] for id_orden in ids]
+                    ).values_list('IdOrden', flat=True))
+                for id_orden in ids:
+                    cambiadas.append(Orden(
+                        IdOrden=id_orden, IdEstado=estado, FechaEstado=ahora, Version=versiones[id_orden]
+                    ))
+            estados = get_catalog(Estado)
+            OrdenEstadoHistorial.objects.bulk_create([
+                OrdenEstadoHistorial.nuevo(
+                    orden, estados.get(actuales[orden.IdOrden][0]), actuales[orden.IdOrden][1], id_usuario
+                )
+                for orden in cambiadas
+            ])
+
+    for orden in cambiadas:
+        id_desde, desde = actuales[orden.IdOrden]
+        metrics.record_cambio_estado(get_catalog(Estado).get(id_desde), estado, desde, orden.FechaEstado)
+        resultados[orden.IdOrden] = {
+            'IdOrden': orden.IdOrden, 'ok': True, 'IdEstado': estado.IdEstado,
+            'Version': orden.Version, 'FechaEstado': orden.FechaEstado,
+        }
+    if len(resultados) < len(ids_orden):
+        conflictos = [id_orden for id_orden in ids_orden if id_orden not in resultados]
+        for id_orden, id_actual in Orden.objects.filter(pk__in=conflictos).values_list('IdOrden', 'IdEstado'):
+            resultados[id_orden] = {
+                'IdOrden': id_orden, 'ok': False, 'error': 'La orden cambió de estado', 'IdEstado': id_actual,
+            }
+        for id_orden in conflictos:
+            resultados.setdefault(id_orden, {'IdOrden': id_orden, 'ok': False, 'error': 'Orden no encontrada'})
+    return cambiadas, [resultados[id_orden] for id_orden in ids_orden]
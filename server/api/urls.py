@@ -2,7 +2,8 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     EstadoViewSet, TipoProductoViewSet, TipoUsuarioViewSet,
-    ProductoViewSet, UsuarioViewSet, MesaViewSet, OrdenViewSet, AuthViewSet
+    ProductoViewSet, UsuarioViewSet, MesaViewSet, OrdenViewSet, AuthViewSet, CacheViewSet,
+    MetricasViewSet, ReportesViewSet
 )
 
 router = DefaultRouter()
@@ -12,6 +13,9 @@ router.register(r'usuarios', UsuarioViewSet, basename='usuario')
 router.register(r'mesas', MesaViewSet, basename='mesa')
 router.register(r'ordenes', OrdenViewSet, basename='orden')
 router.register(r'auth', AuthViewSet, basename='auth')
+router.register(r'cache', CacheViewSet, basename='cache')
+router.register(r'metricas', MetricasViewSet, basename='metricas')
+router.register(r'reportes', ReportesViewSet, basename='reportes')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -2,97 +2,409 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken
 from django.contrib.auth.hashers import check_password
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch, Sum
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_date
+from django.utils.http import http_date, quote_etag
+import hashlib
+from datetime import datetime, timedelta
 from .models import (
     Estado, TipoProducto, TipoUsuario, Persona,
-    Producto, Usuario, Mesa, Orden, ProductoOrden
+    Producto, Usuario, Mesa, Orden, ProductoOrden, OrdenEliminada,
+    ResumenDia, ResumenHora, Secuencia
+)
+from .fast_serializers import OrdenFastSerializer, ProductoFastSerializer, UsuarioFastSerializer
+from .cache import MENU_SECUENCIA, get_catalog, menu_cache, stats as cache_stats, usuarios_activos
+from . import metrics
+from .health import readiness
+from . import idempotencia
+from .reportes import AGRUPACIONES, ventas, ventas_json
+from .resumenes import CAMPOS as RESUMEN_CAMPOS, DIMENSIONES
+from .sincronizacion import crear_ordenes
+from .transiciones import cambiar_estado, cambiar_estado_lote
+from .mixins import CatalogCacheMixin, FastSerializerMixin
+from .pagination import OrdenPagination
+from .passwords import PasswordHasherBusy
+from .tokens import RevocableRefreshToken
+from .renderers import CompactoJSONRenderer
+from .events import (
+    publish_orden_creada, publish_orden_eliminada, publish_orden_estado, publish_orden_productos,
 )
 from .serializers import (
     EstadoSerializer, TipoProductoSerializer, TipoUsuarioSerializer,
     PersonaSerializer, ProductoSerializer, UsuarioSerializer,
-    MesaSerializer, OrdenSerializer, CreateOrdenSerializer
+    MesaSerializer, OrdenSerializer, CreateOrdenSerializer, AgregarProductosSerializer, ordenes_compacto
 )
 
 
-class EstadoViewSet(viewsets.ReadOnlyModelViewSet):
+# Estados que se muestran en la cola de cocina, en orden de llegada.
+ESTADOS_COCINA = ('Pendiente', 'En Preparación', 'Listo')
+
+CAMBIOS_LIMIT = 500
+CAMBIOS_MAX_LIMIT = 1000
+
+ESTADO_LOTE_MAX = 200
+ORDENES_LOTE_MAX = 100
+
+
+class EstadoViewSet(CatalogCacheMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Estado.objects.all()
     serializer_class = EstadoSerializer
 
 
-class TipoProductoViewSet(viewsets.ReadOnlyModelViewSet):
+class TipoProductoViewSet(CatalogCacheMixin, viewsets.ReadOnlyModelViewSet):
     queryset = TipoProducto.objects.all()
     serializer_class = TipoProductoSerializer
 
 
-class TipoUsuarioViewSet(viewsets.ReadOnlyModelViewSet):
+class TipoUsuarioViewSet(CatalogCacheMixin, viewsets.ReadOnlyModelViewSet):
     queryset = TipoUsuario.objects.all()
     serializer_class = TipoUsuarioSerializer
 
 
-class ProductoViewSet(viewsets.ModelViewSet):
+class ProductoViewSet(FastSerializerMixin, viewsets.ModelViewSet):
     queryset = Producto.objects.select_related('IdTipoProducto', 'IdEstado').all()
     serializer_class = ProductoSerializer
+    fast_serializer_class = ProductoFastSerializer
+
+    def list(self, request, *args, **kwargs):
+        """
+        Menú con ETag/Last-Modified según la versión del menú: si el cliente ya
+        tiene la versión actual recibe 304; si no, se sirve el cuerpo guardado
+        en memoria para esa versión y esos parámetros. Solo el JSON se guarda:
+        la API navegable incluye datos del usuario (nombre, token CSRF).
+        """
+        if not isinstance(request.accepted_renderer, JSONRenderer):
+            return super().list(request, *args, **kwargs)
+        version, modificado = Secuencia.estado(MENU_SECUENCIA)
+        key = (request.get_full_path(), request.accepted_media_type)
+        etag = quote_etag(f"{version}-{hashlib.md5(repr(key).encode('utf-8')).hexdigest()}")
+        last_modified = int(modificado.timestamp()) if modificado else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            body = menu_cache.get(version, key)
+            if body is None:
+                drf_response = super().list(request, *args, **kwargs)
+                body = request.accepted_renderer.render(
+                    drf_response.data, request.accepted_media_type, self.get_renderer_context()
+                )
+                menu_cache.set(version, key, body)
+            content_type = request.accepted_media_type
+            if request.accepted_renderer.charset:
+                content_type = f'{content_type}; charset={request.accepted_renderer.charset}'
+            response = HttpResponse(body, content_type=content_type)
+
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        response['Cache-Control'] = 'no-cache'
+        return response
 
 
-class UsuarioViewSet(viewsets.ReadOnlyModelViewSet):
+class UsuarioViewSet(FastSerializerMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Usuario.objects.select_related('IdPersona', 'IdTipoUsuario', 'IdEstado').all()
     serializer_class = UsuarioSerializer
+    fast_serializer_class = UsuarioFastSerializer
 
 
-class MesaViewSet(viewsets.ReadOnlyModelViewSet):
+class MesaViewSet(CatalogCacheMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Mesa.objects.all()
     serializer_class = MesaSerializer
 
 
-class OrdenViewSet(viewsets.ModelViewSet):
+class OrdenViewSet(FastSerializerMixin, viewsets.ModelViewSet):
     queryset = Orden.objects.select_related(
-        'IdUsuario', 'IdUsuario__IdPersona', 'IdUsuario__IdTipoUsuario',
+        'IdUsuario', 'IdUsuario__IdPersona', 'IdUsuario__IdTipoUsuario', 'IdUsuario__IdEstado',
         'IdMesa', 'IdEstado'
-    ).prefetch_related('productos_orden__IdProducto__IdTipoProducto').all()
+    ).prefetch_related(Prefetch(
+        'productos_orden',
+        queryset=ProductoOrden.objects.select_related('IdProducto__IdTipoProducto', 'IdProducto__IdEstado'),
+    )).all()
     serializer_class = OrdenSerializer
+    fast_serializer_class = OrdenFastSerializer
+    fast_serializer_actions = ('list', 'retrieve', 'cocina', 'cambios')
+    pagination_class = OrdenPagination
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, CompactoJSONRenderer]
+
+    def get_renderers(self):
+        # Solo ``list`` sabe producir la forma compacta; en las demás acciones
+        # ?format=compacto responde 404 y Accept compacto responde 406.
+        renderers = super().get_renderers()
+        if self.action != 'list':
+            renderers = [renderer for renderer in renderers if not isinstance(renderer, CompactoJSONRenderer)]
+        return renderers
+
+    def list(self, request, *args, **kwargs):
+        if request.accepted_renderer.format != CompactoJSONRenderer.format:
+            return super().list(request, *args, **kwargs)
+
+        # Modo compacto: sin joins ni serializers anidados
+        queryset = self.filter_queryset(Orden.objects.only(
+            'IdOrden', 'IdUsuario', 'IdMesa', 'IdEstado', 'FechaCreacion', 'Version'
+        ))
+        page = self.paginate_queryset(queryset)
+        ordenes = page if page is not None else list(queryset)
+        resultados, incluidos = ordenes_compacto(ordenes)
+        if page is None:
+            return Response({'results': resultados, 'incluidos': incluidos})
+        response = self.get_paginated_response(resultados)
+        response.data['incluidos'] = incluidos
+        return response
 
     def create(self, request, *args, **kwargs):
-        serializer = CreateOrdenSerializer(data=request.data)
-        if serializer.is_valid():
-            orden = Orden.objects.create(
-                IdUsuario_id=serializer.validated_data['IdUsuario'],
-                IdMesa_id=serializer.validated_data['IdMesa'],
-                IdEstado_id=serializer.validated_data['IdEstado']
-            )
-            
-            # Crear productos de la orden
-            for producto_data in serializer.validated_data['Productos']:
-                ProductoOrden.objects.create(
-                    IdProducto_id=producto_data['IdProducto'],
-                    IdOrden=orden,
-                    Cantidad=producto_data.get('Cantidad', 1),
-                    Notas=producto_data.get('Notas')
+        """
+        Con la cabecera ``Idempotency-Key`` un reintento con la misma clave
+        retorna la respuesta 201 original sin crear otra orden (ver ``api.idempotencia``).
+        """
+        clave = request.headers.get('Idempotency-Key')
+        if clave is not None:
+            if not clave or len(clave) > idempotencia.MAX_CLAVE:
+                return Response(
+                    {'error': f'Idempotency-Key debe tener entre 1 y {idempotencia.MAX_CLAVE} caracteres'},
+                    status=status.HTTP_400_BAD_REQUEST
                 )
-            
-            response_serializer = OrdenSerializer(orden)
-            return Response(response_serializer.data, status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            huella = idempotencia.huella(request.data)
+            registro = idempotencia.buscar(request.user.id, clave)
+            if registro is not None:
+                return self._repetir(registro, huella)
+
+        serializer = CreateOrdenSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        if clave is None:
+            orden = serializer.save()
+            data = OrdenSerializer(orden).data
+        else:
+            try:
+                with transaction.atomic():
+                    orden = serializer.save()
+                    data = OrdenSerializer(orden).data
+                    idempotencia.guardar(request.user.id, clave, huella, orden.IdOrden, data)
+            except IntegrityError:
+                # Otra petición con la misma clave terminó primero: se deshizo esta orden
+                registro = idempotencia.buscar(request.user.id, clave)
+                if registro is None:
+                    raise
+                return self._repetir(registro, huella)
+        metrics.ordenes_creadas.inc()
+        publish_orden_creada(orden)
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    def _repetir(self, registro, huella):
+        if registro.huella != huella:
+            return Response(
+                {'error': 'Idempotency-Key ya se usó con otra petición'},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY
+            )
+        return Response(registro.respuesta, status=status.HTTP_201_CREATED, headers={'Idempotent-Replayed': 'true'})
+
+    def perform_update(self, serializer):
+        orden = serializer.instance
+        estado = serializer.validated_data.pop('IdEstado', orden.IdEstado)
+        cambio_estado = estado.IdEstado != orden.IdEstado_id
+        with transaction.atomic():
+            if cambio_estado:
+                # Mismo UPDATE condicional que la acción ``estado``: si otra
+                # pantalla cambió la orden después de leerla, responde 409.
+                cambio = cambiar_estado(orden.IdOrden, estado, orden.IdEstado_id, self.request.user.id)
+                orden.IdEstado, orden.FechaEstado, version = estado, cambio.FechaEstado, cambio.Version
+            else:
+                version = Orden.siguiente_version()
+            serializer.save(Version=version)
+            if cambio_estado:
+                publish_orden_estado(orden)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            id_orden = instance.IdOrden
+            instance.delete()
+            eliminada = OrdenEliminada.objects.create(IdOrden=id_orden, Version=Orden.siguiente_version())
+            publish_orden_eliminada(id_orden, eliminada.Version)
 
     @action(detail=True, methods=['patch'])
     def estado(self, request, pk=None):
-        orden = self.get_object()
+        """
+        Cambia el estado con un UPDATE condicional según la máquina de estados
+        (ver ``api.transiciones``). ``IdEstadoActual`` (opcional) es el estado
+        en que el cliente vio la orden; si ya no lo tiene, responde 409 con el
+        estado actual. Retorna solo IdOrden, IdEstado, Version y FechaEstado.
+        """
         nuevo_estado_id = request.data.get('IdEstado')
         
         if not nuevo_estado_id:
             return Response({'error': 'IdEstado es requerido'}, status=status.HTTP_400_BAD_REQUEST)
         
+        estado = get_catalog(Estado).get(nuevo_estado_id)
+        if estado is None:
+            return Response({'error': 'Estado no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            id_orden = int(pk)
+            id_esperado = request.data.get('IdEstadoActual')
+            id_esperado = int(id_esperado) if id_esperado is not None else None
+        except (TypeError, ValueError):
+            return Response({'error': 'IdOrden e IdEstadoActual deben ser enteros'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            orden = cambiar_estado(id_orden, estado, id_esperado, request.user.id)
+        except Orden.DoesNotExist:
+            return Response({'error': 'Orden no encontrada'}, status=status.HTTP_404_NOT_FOUND)
+        publish_orden_estado(orden)
+        return Response({
+            'IdOrden': orden.IdOrden,
+            'IdEstado': orden.IdEstado_id,
+            'Version': orden.Version,
+            'FechaEstado': orden.FechaEstado,
+        })
+
+    @action(detail=False, methods=['post'])
+    def lote(self, request):
+        """
+        Crea varias órdenes en una petición (tabletas que estuvieron sin
+        conexión): ``{"Ordenes": [{..., "Clave": "<uuid>"}, ...]}``. Retorna un
+        resultado por orden; las inválidas no impiden crear las demás.
+        """
+        ordenes = request.data.get('Ordenes')
+        if not isinstance(ordenes, list) or not ordenes:
+            return Response({'error': 'Ordenes debe ser una lista no vacía'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ordenes) > ORDENES_LOTE_MAX:
+            return Response(
+                {'error': f'Máximo {ORDENES_LOTE_MAX} órdenes por petición'}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        creadas, resultados = crear_ordenes(ordenes, request.user.id)
+        for orden in creadas:
+            metrics.ordenes_creadas.inc()
+            publish_orden_creada(orden)
+        return Response({'creadas': len(creadas), 'resultados': resultados})
+
+    @action(detail=True, methods=['post'])
+    def productos(self, request, pk=None):
+        """
+        Agrega productos a una orden abierta; si el producto ya está en la
+        orden se suma la cantidad. Retorna la cantidad final de cada producto.
+        """
+        try:
+            id_orden = int(pk)
+        except (TypeError, ValueError):
+            return Response({'error': 'IdOrden debe ser entero'}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = AgregarProductosSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         try:
-            estado = Estado.objects.get(pk=nuevo_estado_id)
-            orden.IdEstado = estado
-            orden.save()
-            serializer = self.get_serializer(orden)
-            return Response(serializer.data)
-        except Estado.DoesNotExist:
+            resultado = serializer.save(IdOrden=id_orden)
+        except Orden.DoesNotExist:
+            return Response({'error': 'Orden no encontrada'}, status=status.HTTP_404_NOT_FOUND)
+        publish_orden_productos(resultado)
+        return Response(resultado)
+
+    @action(detail=False, methods=['patch'], url_path='estado', url_name='estado-lote')
+    def estado_lote(self, request):
+        """
+        Cambia varias órdenes al mismo estado: ``{"IdOrdenes": [...], "IdEstado": n}``.
+
+        Se aplica en una transacción con un UPDATE condicional por estado de
+        origen; cada orden tiene su resultado (``ok`` o el error y su estado
+        actual) y una que no se pueda cambiar no impide cambiar las demás.
+        """
+        ids_orden = request.data.get('IdOrdenes')
+        nuevo_estado_id = request.data.get('IdEstado')
+
+        if not nuevo_estado_id:
+            return Response({'error': 'IdEstado es requerido'}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(ids_orden, list) or not ids_orden:
+            return Response({'error': 'IdOrdenes debe ser una lista no vacía'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids_orden) > ESTADO_LOTE_MAX:
+            return Response(
+                {'error': f'Máximo {ESTADO_LOTE_MAX} órdenes por petición'}, status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            ids_orden = list(dict.fromkeys(int(id_orden) for id_orden in ids_orden))
+        except (TypeError, ValueError):
+            return Response({'error': 'IdOrdenes debe contener enteros'}, status=status.HTTP_400_BAD_REQUEST)
+
+        estado = get_catalog(Estado).get(nuevo_estado_id)
+        if estado is None:
             return Response({'error': 'Estado no encontrado'}, status=status.HTTP_404_NOT_FOUND)
 
+        cambiadas, resultados = cambiar_estado_lote(ids_orden, estado, request.user.id)
+        for orden in cambiadas:
+            publish_orden_estado(orden)
+        return Response({
+            'IdEstado': estado.IdEstado,
+            'cambiadas': len(cambiadas),
+            'resultados': resultados,
+        })
+
+    @action(detail=False, methods=['get'])
+    def cocina(self, request):
+        """Cola de cocina: órdenes activas de la más antigua a la más reciente."""
+        estados = get_catalog(Estado)
+        ids_estado = [
+            estado.IdEstado for estado in map(estados.get_by_name, ESTADOS_COCINA) if estado is not None
+        ]
+        # Filtrar por Id usa el índice (IdEstado, FechaCreacion, IdOrden) y el
+        # costo depende solo de las órdenes activas, no del historial.
+        ordenes = self.get_queryset().filter(IdEstado__in=ids_estado).order_by('FechaCreacion', 'IdOrden')
+        serializer = self.get_serializer(ordenes, many=True)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def cambios(self, request):
+        """
+        Órdenes creadas o modificadas y órdenes eliminadas después de ``since``.
+
+        Retorna un ``cursor`` para la siguiente consulta; si ``mas`` es True
+        quedan cambios pendientes y se debe consultar de nuevo con ese cursor.
+        """
+        try:
+            since = int(request.query_params.get('since', 0))
+            limit = min(int(request.query_params.get('limit', CAMBIOS_LIMIT)), CAMBIOS_MAX_LIMIT)
+        except ValueError:
+            return Response({'error': 'since y limit deben ser enteros'}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1:
+            return Response({'error': 'limit debe ser mayor que 0'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Leer el cursor antes de consultar: un cambio confirmado durante la
+        # consulta se entrega de nuevo en la siguiente sincronización.
+        cursor = Orden.version_actual()
+        ordenes = list(self.get_queryset().filter(Version__gt=since).order_by('Version')[:limit + 1])
+        eliminadas = list(
+            OrdenEliminada.objects.filter(Version__gt=since).values_list('Version', 'IdOrden')[:limit + 1]
+        )
+
+        cambios = sorted(
+            [(orden.Version, orden) for orden in ordenes] + eliminadas,
+            key=lambda cambio: cambio[0]
+        )
+        mas = len(cambios) > limit
+        if mas:
+            cambios = cambios[:limit]
+            cursor = cambios[-1][0]
+
+        return Response({
+            'cursor': cursor,
+            'mas': mas,
+            'ordenes': self.get_serializer(
+                [valor for _, valor in cambios if isinstance(valor, Orden)], many=True
+            ).data,
+            'eliminadas': [valor for _, valor in cambios if not isinstance(valor, Orden)],
+        })
+
 
 class AuthViewSet(viewsets.ViewSet):
+    # login y verify manejan el token ellos mismos: un token vencido en la
+    # cabecera no debe impedir iniciar sesión de nuevo.
+    authentication_classes = []
     permission_classes = [AllowAny]
 
     @action(detail=False, methods=['post'])
@@ -108,31 +420,53 @@ class AuthViewSet(viewsets.ViewSet):
         
         try:
             usuario = Usuario.objects.select_related(
-                'IdPersona', 'IdTipoUsuario', 'IdEstado'
+                'IdPersona', 'IdTipoUsuario'
             ).get(Username=username)
         except Usuario.DoesNotExist:
+            metrics.logins.inc('credenciales_invalidas')
             return Response(
                 {'error': 'Credenciales inválidas'},
                 status=status.HTTP_401_UNAUTHORIZED
             )
         
-        if usuario.IdEstado.Estado != 'Activo':
+        estado = get_catalog(Estado).get(usuario.IdEstado_id)
+        if estado is None or estado.Estado != 'Activo':
+            metrics.logins.inc('inactivo')
             return Response(
                 {'error': 'Usuario inactivo'},
                 status=status.HTTP_401_UNAUTHORIZED
             )
         
-        if not usuario.check_password(password):
+        try:
+            if not usuario.check_password(password):
+                metrics.logins.inc('credenciales_invalidas')
+                return Response(
+                    {'error': 'Credenciales inválidas'},
+                    status=status.HTTP_401_UNAUTHORIZED
+                )
+        except PasswordHasherBusy:
+            metrics.logins.inc('ocupado')
             return Response(
-                {'error': 'Credenciales inválidas'},
-                status=status.HTTP_401_UNAUTHORIZED
+                {'error': 'Servidor ocupado, intente de nuevo'},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={'Retry-After': '1'}
             )
+
+        if usuario.password_needs_rehash():
+            # El costo configurado cambió: actualizar el hash aprovechando que
+            # se conoce la contraseña. Si el pool está lleno se intenta en el
+            # siguiente login.
+            try:
+                usuario.set_password(password)
+                Usuario.objects.filter(pk=usuario.pk).update(Password=usuario.Password)
+            except PasswordHasherBusy:
+                pass
         
+        usuario.IdEstado = estado
+        metrics.logins.inc('ok')
+
         # Generar token JWT
-        refresh = RefreshToken()
-        refresh['IdUsuario'] = usuario.IdUsuario
-        refresh['Username'] = usuario.Username
-        refresh['IdTipoUsuario'] = usuario.IdTipoUsuario.IdTipoUsuario
+        refresh = RevocableRefreshToken.for_usuario(usuario)
         
         access_token = refresh.access_token
         
@@ -140,16 +474,60 @@ class AuthViewSet(viewsets.ViewSet):
         
         return Response({
             'usuario': usuario_serializer.data,
-            'token': str(access_token)
+            'token': str(access_token),
+            'refresh': str(refresh)
+        })
+
+    @action(detail=False, methods=['post'])
+    def refresh(self, request):
+        # Rotación: el refresh token usado queda revocado y se entrega uno nuevo
+        token = request.data.get('refresh')
+        if not token:
+            return Response({'error': 'refresh es requerido'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            refresh = RevocableRefreshToken(token)
+        except TokenError:
+            return Response(
+                {'error': 'Token inválido'},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+
+        if usuarios_activos.get(refresh.get('IdUsuario')) is None:
+            return Response(
+                {'error': 'Usuario inactivo'},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+
+        try:
+            nuevo = refresh.rotate()
+        except TokenError:
+            return Response(
+                {'error': 'Token revocado'},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+
+        return Response({
+            'token': str(nuevo.access_token),
+            'refresh': str(nuevo)
         })
 
+    @action(detail=False, methods=['post'])
+    def logout(self, request):
+        token = request.data.get('refresh')
+        if not token:
+            return Response({'error': 'refresh es requerido'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            RevocableRefreshToken(token).revoke()
+        except TokenError:
+            pass
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
     @action(detail=False, methods=['get'])
     def verify(self, request):
-        # La autenticación se maneja por el middleware JWT
-        # El token JWT contiene el IdUsuario en el claim
-        from rest_framework_simplejwt.tokens import UntypedToken
-        from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
-        
+        # Solo se valida la firma y la expiración del token; los datos del
+        # usuario salen de la caché de usuarios activos, sin consultar la base.
         auth_header = request.headers.get('Authorization', '')
         if not auth_header.startswith('Bearer '):
             return Response(
@@ -158,25 +536,177 @@ class AuthViewSet(viewsets.ViewSet):
             )
         
         try:
-            token = auth_header.split(' ')[1]
-            untyped_token = UntypedToken(token)
-            usuario_id = untyped_token.get('IdUsuario')
-            
-            usuario = Usuario.objects.select_related(
-                'IdPersona', 'IdTipoUsuario', 'IdEstado'
-            ).get(pk=usuario_id)
-            
-            if usuario.IdEstado.Estado != 'Activo':
-                return Response(
-                    {'error': 'Usuario inactivo'},
-                    status=status.HTTP_401_UNAUTHORIZED
-                )
-            
-            usuario_serializer = UsuarioSerializer(usuario)
-            return Response({'usuario': usuario_serializer.data})
-        except (TokenError, InvalidToken, Usuario.DoesNotExist, KeyError):
+            token = AccessToken(auth_header.split(' ')[1])
+        except (TokenError, IndexError):
             return Response(
                 {'error': 'Token inválido'},
                 status=status.HTTP_401_UNAUTHORIZED
             )
 
+        usuario = usuarios_activos.get_data(token.get('IdUsuario'))
+        if usuario is None:
+            return Response(
+                {'error': 'Usuario inactivo'},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+        return Response({'usuario': usuario})
+
+
+class CacheViewSet(viewsets.ViewSet):
+    def list(self, request):
+        return Response(cache_stats())
+
+
+def _rango_fechas(request):
+    """
+    Lee ``desde`` y ``hasta`` (AAAA-MM-DD, ambos incluidos) de la URL; por
+    defecto los últimos 7 días. Retorna ``(desde, hasta, error)``.
+    """
+    hoy = timezone.localdate()
+    fechas = {'desde': hoy - timedelta(days=6), 'hasta': hoy}
+    for nombre in fechas:
+        valor = request.query_params.get(nombre)
+        if valor is None:
+            continue
+        try:
+            fechas[nombre] = parse_date(valor)
+        except ValueError:
+            fechas[nombre] = None
+        if fechas[nombre] is None:
+            return None, None, 'desde y hasta deben ser fechas AAAA-MM-DD'
+    desde, hasta = fechas['desde'], fechas['hasta']
+    if desde > hasta:
+        return None, None, 'desde no puede ser posterior a hasta'
+    return desde, hasta, None
+
+
+def _nombres(dimension, claves):
+    """Nombre legible de cada Id de la dimensión (producto, mesa, usuario...)."""
+    if dimension == 'total':
+        return {0: 'Total'}
+    if dimension == 'producto':
+        return dict(Producto.objects.filter(pk__in=claves).values_list('IdProducto', 'NombreProducto'))
+    if dimension == 'usuario':
+        return dict(Usuario.objects.filter(pk__in=claves).values_list('IdUsuario', 'Username'))
+    catalogo = get_catalog(TipoProducto if dimension == 'tipo_producto' else Mesa)
+    return {clave: str(catalogo.get(clave)) for clave in claves if catalogo.get(clave) is not None}
+
+
+def _fila_resumen(fila):
+    """Agrega promedios a una fila con los totales de ``Resumen``."""
+    fila['TicketPromedio'] = round(fila['Ingresos'] / fila['Ordenes'], 2) if fila['Ordenes'] else None
+    fila['SegundosPreparacionPromedio'] = (
+        round(fila['SegundosPreparacion'] / fila['Preparaciones'], 1) if fila['Preparaciones'] else None
+    )
+    return fila
+
+
+class ReportesViewSet(viewsets.ViewSet):
+    """
+    ``resumen`` y ``por_hora`` leen los resúmenes precalculados
+    (``ResumenHora``/``ResumenDia``) que mantiene ``actualizar_resumenes``;
+    ``ventas`` agrega las órdenes directamente en la base de datos.
+    """
+
+    @action(detail=False, methods=['get'])
+    def ventas(self, request):
+        """
+        Ventas (órdenes, unidades, ingresos) de las órdenes no canceladas
+        creadas en el rango, agrupadas por producto, tipo_producto, mesero,
+        mesa u hora, con los totales del rango. La respuesta se transmite.
+        """
+        agrupar = request.query_params.get('agrupar', 'producto')
+        if agrupar not in AGRUPACIONES:
+            return Response(
+                {'error': f"agrupar debe ser uno de: {', '.join(AGRUPACIONES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        desde, hasta, error = _rango_fechas(request)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+        inicio = timezone.make_aware(datetime.combine(desde, datetime.min.time()))
+        fin = timezone.make_aware(datetime.combine(hasta + timedelta(days=1), datetime.min.time()))
+        totales, filas = ventas(inicio, fin, agrupar)
+        encabezado = {'agrupar': agrupar, 'desde': desde, 'hasta': hasta}
+        return StreamingHttpResponse(
+            ventas_json(encabezado, totales, filas), content_type='application/json; charset=utf-8'
+        )
+
+    @action(detail=False, methods=['get'])
+    def resumen(self, request):
+        """Totales por producto, tipo_producto, mesa, usuario o total en un rango de días."""
+        dimension = request.query_params.get('dimension', 'total')
+        if dimension not in DIMENSIONES:
+            return Response(
+                {'error': f"dimension debe ser una de: {', '.join(DIMENSIONES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        desde, hasta, error = _rango_fechas(request)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+        filas = list(
+            ResumenDia.objects.filter(Dia__range=(desde, hasta), Dimension=dimension)
+            .values('Clave')
+            .annotate(**{campo: Sum(campo) for campo in RESUMEN_CAMPOS})
+            .order_by('-Ingresos', 'Clave')
+        )
+        nombres = _nombres(dimension, [fila['Clave'] for fila in filas])
+        for fila in filas:
+            fila['Nombre'] = nombres.get(fila['Clave'])
+            _fila_resumen(fila)
+        return Response({'dimension': dimension, 'desde': desde, 'hasta': hasta, 'results': filas})
+
+    @action(detail=False, methods=['get'])
+    def por_hora(self, request):
+        """Serie por hora (órdenes, ingresos, tiempo de preparación) de una dimensión y clave."""
+        dimension = request.query_params.get('dimension', 'total')
+        if dimension not in DIMENSIONES:
+            return Response(
+                {'error': f"dimension debe ser una de: {', '.join(DIMENSIONES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            clave = int(request.query_params.get('clave', 0))
+        except ValueError:
+            return Response({'error': 'clave debe ser un entero'}, status=status.HTTP_400_BAD_REQUEST)
+        desde, hasta, error = _rango_fechas(request)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+        inicio = timezone.make_aware(datetime.combine(desde, datetime.min.time()))
+        fin = timezone.make_aware(datetime.combine(hasta + timedelta(days=1), datetime.min.time()))
+        filas = []
+        for fila in ResumenHora.objects.filter(
+            Hora__gte=inicio, Hora__lt=fin, Dimension=dimension, Clave=clave
+        ).values('Hora', *RESUMEN_CAMPOS):
+            fila['Hora'] = timezone.localtime(fila['Hora'])
+            filas.append(_fila_resumen(fila))
+        return Response({'dimension': dimension, 'clave': clave, 'results': filas})
+
+
+class MetricasViewSet(viewsets.ViewSet):
+    """Consultas SQL y tiempos por ruta de este proceso (ver ``RequestMetricsMiddleware``)."""
+
+    def list(self, request):
+        return Response(metrics.snapshot())
+
+
+def health_live(request):
+    """Liveness: el proceso responde; no toca la base de datos."""
+    return JsonResponse({'status': 'ok', 'message': 'Server is running'})
+
+
+def health_ready(request):
+    """Readiness: 200 si la base de datos, las migraciones y las cachés están listas; si no, 503."""
+    listo, resultado = readiness()
+    return JsonResponse(resultado, status=200 if listo else 503)
+
+
+def metrics_prometheus(request):
+    """``/metrics`` en formato de texto de Prometheus; no requiere token, como ``/health``."""
+    return HttpResponse(
+        metrics.prometheus(cache_stats()),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
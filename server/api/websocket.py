@@ -0,0 +1,72 @@
+"""
+Canal WebSocket ``/ws/ordenes/`` servido directamente por la aplicación ASGI.
+
+El cliente se autentica con el token de acceso en el query string
+(``/ws/ordenes/?token=<jwt>``), ya que los navegadores no permiten enviar
+cabeceras en el handshake. Cada evento publicado en el broker se envía como
+un mensaje de texto JSON.
+"""
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .cache import usuarios_activos
+from .events import get_broker
+
+
+WEBSOCKET_PATH = '/ws/ordenes/'
+
+# Códigos de cierre de la aplicación (rango 4000-4999).
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_NOT_FOUND = 4404
+
+
+def _token_valido(scope):
+    query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    token = query.get('token', [None])[0]
+    if not token:
+        return False
+    try:
+        id_usuario = AccessToken(token).get('IdUsuario')
+    except (TokenError, InvalidToken):
+        return False
+    return usuarios_activos.get(id_usuario) is not None
+
+
+async def ordenes_websocket(scope, receive, send):
+    message = await receive()
+    if message['type'] != 'websocket.connect':
+        return
+
+    if scope['path'] != WEBSOCKET_PATH:
+        await send({'type': 'websocket.close', 'code': CLOSE_NOT_FOUND})
+        return
+    if not await sync_to_async(_token_valido)(scope):
+        await send({'type': 'websocket.close', 'code': CLOSE_UNAUTHORIZED})
+        return
+
+    await send({'type': 'websocket.accept'})
+
+    async with get_broker().subscribe() as subscription:
+        receive_task = asyncio.ensure_future(receive())
+        event_task = asyncio.ensure_future(subscription.get())
+        try:
+            while True:
+                done, _ = await asyncio.wait(
+                    {receive_task, event_task}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if event_task in done:
+                    await send({'type': 'websocket.send', 'text': json.dumps(event_task.result())})
+                    event_task = asyncio.ensure_future(subscription.get())
+                if receive_task in done:
+                    if receive_task.result()['type'] == 'websocket.disconnect':
+                        break
+                    # Los mensajes del cliente se ignoran; el canal es solo de salida.
+                    receive_task = asyncio.ensure_future(receive())
+        finally:
+            receive_task.cancel()
+            event_task.cancel()
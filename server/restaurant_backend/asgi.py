@@ -2,6 +2,8 @@
 ASGI config for restaurant_backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP requests are handled by Django; WebSocket connections are routed to the
+order event channel (``/ws/ordenes/``).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
@@ -13,5 +15,14 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'restaurant_backend.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
 
+# Importar después de inicializar Django para que las apps estén cargadas.
+from api.websocket import ordenes_websocket  # noqa: E402
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'websocket':
+        await ordenes_websocket(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -5,6 +5,7 @@ Django settings for restaurant_backend project.
 from pathlib import Path
 from datetime import timedelta
 import os
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -41,6 +42,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -75,12 +77,51 @@ WSGI_APPLICATION = 'restaurant_backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_ENGINE=postgresql para producción; por defecto SQLite para instalaciones
+# pequeñas (en modo WAL con busy timeout, ver api.apps).
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'kitchon'),
+            'USER': os.environ.get('DB_USER', 'kitchon'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            # Conexiones persistentes por hilo, verificadas antes de reutilizarse
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
     }
-}
+    DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', 0))
+    if DB_POOL_MAX_SIZE:
+        # El pool reemplaza a las conexiones persistentes
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+            'max_size': DB_POOL_MAX_SIZE,
+            'timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        }
+elif DB_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                # Segundos que un escritor espera el lock antes de "database is locked"
+                'timeout': int(os.environ.get('DB_TIMEOUT', 20)),
+                # BEGIN IMMEDIATE toma el lock de escritura al abrir la transacción:
+                # en WAL una transacción que lee y luego escribe no puede esperar
+                # con el busy timeout y fallaría de inmediato con "database is locked"
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
+    }
+else:
+    raise ImproperlyConfigured(f'DB_ENGINE no soportado: {DB_ENGINE}')
 
 
 # Password validation
@@ -102,6 +143,18 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Costo de bcrypt para contraseñas nuevas; los hashes con otro costo se
+# actualizan en el siguiente login exitoso.
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+
+# Hilos que verifican contraseñas en paralelo y solicitudes que pueden esperar
+# turno; con el pool lleno el login responde 429. Cada solicitud en espera
+# ocupa un hilo del servidor, así que la cola debe ser pequeña (0 = rechazar
+# apenas no haya un hilo de bcrypt libre).
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 4))
+PASSWORD_HASH_QUEUE = int(os.environ.get('PASSWORD_HASH_QUEUE', 4))
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
 
@@ -127,7 +180,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -136,15 +189,56 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 100,
 }
 
+# Viewsets (por basename) que usan la serialización rápida basada en values()
+# en sus acciones de lectura. Ej.: FAST_SERIALIZERS=orden,producto
+FAST_SERIALIZERS = [
+    basename for basename in os.environ.get('FAST_SERIALIZERS', 'orden,producto,usuario').split(',')
+    if basename
+]
+
+# Segundos que un proceso conserva en memoria los catálogos (Estado,
+# TipoProducto, TipoUsuario, Mesa) si no recibe una señal de escritura.
+CATALOG_CACHE_TTL = int(os.environ.get('CATALOG_CACHE_TTL', 300))
+
+# Segundos máximos que otro proceso tarda en rechazar el token de un usuario
+# desactivado (en el proceso que hizo el cambio es inmediato).
+USUARIOS_ACTIVOS_TTL = int(os.environ.get('USUARIOS_ACTIVOS_TTL', 30))
+
+# Métricas por petición (consultas SQL y tiempos) en la cabecera Server-Timing
+# y en /api/metricas/. REQUEST_METRICS=0 desactiva el middleware.
+REQUEST_METRICS = os.environ.get('REQUEST_METRICS', '1').lower() in ('1', 'true')
+
+# /health/ready: límite de cada chequeo y segundos que se reutiliza el resultado
+HEALTH_CHECK_TIMEOUT = float(os.environ.get('HEALTH_CHECK_TIMEOUT', 2))
+HEALTH_READY_TTL = float(os.environ.get('HEALTH_READY_TTL', 5))
+
+# Idempotency-Key al crear órdenes: segundos que se conserva cada clave y
+# cuántas claves recientes guarda cada proceso en memoria.
+IDEMPOTENCY_KEY_TTL = int(os.environ.get('IDEMPOTENCY_KEY_TTL', 86400))
+IDEMPOTENCY_CACHE_SIZE = int(os.environ.get('IDEMPOTENCY_CACHE_SIZE', 1000))
+
 # JWT Settings
 SIMPLE_JWT = {
-    'ACCESS_TOKEN_LIFETIME': timedelta(hours=24),
+    # Tokens de acceso cortos; el cliente los renueva con /api/auth/refresh/
+    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=int(os.environ.get('ACCESS_TOKEN_MINUTES', 15))),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
     'AUTH_HEADER_TYPES': ('Bearer',),
+    'USER_ID_CLAIM': 'IdUsuario',
+    'USER_ID_FIELD': 'IdUsuario',
+}
+
+# Eventos de órdenes en tiempo real (WebSocket /ws/ordenes/, requiere ASGI).
+# El broker en memoria solo reparte dentro del proceso; con varios procesos
+# se debe configurar un backend compartido con la misma interfaz.
+ORDER_EVENTS = {
+    'BACKEND': os.environ.get('ORDER_EVENTS_BACKEND', 'api.events.InProcessBroker'),
+    'OPTIONS': {
+        'max_queue': 100,
+    },
 }
 
 # CORS Settings
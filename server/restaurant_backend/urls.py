@@ -4,9 +4,14 @@ URL configuration for restaurant_backend project.
 from django.contrib import admin
 from django.urls import path, include
 
+from api.views import health_live, health_ready, metrics_prometheus
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
-    path('health', lambda request: __import__('django.http').http.JsonResponse({'status': 'ok', 'message': 'Server is running'})),
+    path('health', health_live),
+    path('health/live', health_live),
+    path('health/ready', health_ready),
+    path('metrics', metrics_prometheus),
 ]
 
@@ -91,7 +91,7 @@ function App() {
   };
 
   const handleLogout = () => {
-    API.removeToken();
+    API.logout();
     setCurrentUser(null);
     setUserRole(null);
     setOrdenes([]);
@@ -104,7 +104,9 @@ function App() {
       toast.success('Estado de orden actualizado');
     } catch (error) {
       console.error('Error actualizando orden:', error);
-      toast.error('Error al actualizar el estado de la orden');
+      // 409: transición no permitida o la orden ya cambió en otra pantalla
+      toast.error(error instanceof Error ? error.message : 'Error al actualizar el estado de la orden');
+      await loadOrdenes();
     }
   };
 
@@ -28,7 +28,7 @@ export function LoginScreen({ onLogin }: LoginScreenProps) {
 
     try {
       const response = await login(username, password);
-      saveToken(response.token);
+      saveToken(response.token, response.refresh);
       
       // Convertir la respuesta del API al formato esperado
       const usuario: Usuario = {
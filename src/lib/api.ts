@@ -6,10 +6,41 @@ interface ApiError {
   error: string;
 }
 
+// Renueva el token de acceso con el refresh token (una sola petición a la vez)
+let refreshPromise: Promise<boolean> | null = null;
+
+async function refreshAccessToken(): Promise<boolean> {
+  const refresh = localStorage.getItem('refresh');
+  if (!refresh) {
+    return false;
+  }
+  if (!refreshPromise) {
+    refreshPromise = fetch(`${API_BASE_URL}/api/auth/refresh/`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ refresh }),
+    })
+      .then(async (response) => {
+        if (!response.ok) {
+          return false;
+        }
+        const data: { token: string; refresh: string } = await response.json();
+        saveToken(data.token, data.refresh);
+        return true;
+      })
+      .catch(() => false)
+      .finally(() => {
+        refreshPromise = null;
+      });
+  }
+  return refreshPromise;
+}
+
 // Función auxiliar para hacer peticiones
 async function request<T>(
   endpoint: string,
-  options: RequestInit = {}
+  options: RequestInit = {},
+  retry = true
 ): Promise<T> {
   const token = localStorage.getItem('token');
   
@@ -27,6 +58,13 @@ async function request<T>(
     headers,
   });
 
+  // Token de acceso vencido: renovarlo y repetir la petición una vez
+  if (response.status === 401 && retry && !endpoint.startsWith('/api/auth/login')) {
+    if (await refreshAccessToken()) {
+      return request<T>(endpoint, options, false);
+    }
+  }
+
   if (!response.ok) {
     const error: ApiError = await response.json().catch(() => ({ error: 'Error desconocido' }));
     throw new Error(error.error || `Error ${response.status}: ${response.statusText}`);
@@ -39,6 +77,7 @@ async function request<T>(
 export interface LoginResponse {
   usuario: any;
   token: string;
+  refresh: string;
 }
 
 export async function login(username: string, password: string): Promise<LoginResponse> {
@@ -48,6 +87,17 @@ export async function login(username: string, password: string): Promise<LoginRe
   });
 }
 
+export async function logout(): Promise<void> {
+  const refresh = localStorage.getItem('refresh');
+  if (refresh) {
+    await request<void>('/api/auth/logout/', {
+      method: 'POST',
+      body: JSON.stringify({ refresh }),
+    }, false).catch(() => undefined);
+  }
+  removeToken();
+}
+
 export async function verifyToken(): Promise<{ usuario: any }> {
   return request<{ usuario: any }>('/api/auth/verify/');
 }
@@ -84,17 +134,92 @@ export interface CreateOrdenData {
   }>;
 }
 
-export async function createOrden(data: CreateOrdenData): Promise<OrdenResponse> {
-  return request<OrdenResponse>('/api/ordenes/', {
+// La misma Idempotency-Key en un reintento retorna la orden ya creada en lugar de duplicarla
+export async function createOrden(
+  data: CreateOrdenData,
+  idempotencyKey: string = crypto.randomUUID()
+): Promise<OrdenResponse> {
+  const options: RequestInit = {
     method: 'POST',
     body: JSON.stringify(data),
+    headers: { 'Idempotency-Key': idempotencyKey },
+  };
+  try {
+    return await request<OrdenResponse>('/api/ordenes/', options);
+  } catch (error) {
+    // Falla de red: la orden pudo haberse creado, reintentar con la misma clave
+    if (error instanceof TypeError) {
+      return request<OrdenResponse>('/api/ordenes/', options);
+    }
+    throw error;
+  }
+}
+
+export interface OrdenLoteResultado {
+  indice: number;
+  ok: boolean;
+  repetida?: boolean;
+  orden?: OrdenResponse;
+  errores?: Record<string, unknown>;
+}
+
+// Envía las órdenes guardadas sin conexión; con la misma Clave un reenvío no las duplica
+export async function syncOrdenes(
+  Ordenes: Array<CreateOrdenData & { Clave: string }>
+): Promise<{ creadas: number; resultados: OrdenLoteResultado[] }> {
+  return request('/api/ordenes/lote/', {
+    method: 'POST',
+    body: JSON.stringify({ Ordenes }),
   });
 }
 
-export async function updateOrdenEstado(id: number, IdEstado: number): Promise<OrdenResponse> {
-  return request<OrdenResponse>(`/api/ordenes/${id}/estado/`, {
+export interface OrdenEstadoResponse {
+  IdOrden: number;
+  IdEstado: number;
+  Version: number;
+  FechaEstado: string;
+}
+
+// Con IdEstadoActual, el servidor responde 409 si otra pantalla ya cambió la orden
+export async function updateOrdenEstado(
+  id: number,
+  IdEstado: number,
+  IdEstadoActual?: number
+): Promise<OrdenEstadoResponse> {
+  return request<OrdenEstadoResponse>(`/api/ordenes/${id}/estado/`, {
     method: 'PATCH',
-    body: JSON.stringify({ IdEstado }),
+    body: JSON.stringify({ IdEstado, IdEstadoActual }),
+  });
+}
+
+// Agrega productos a una orden abierta; si el producto ya está se suma la cantidad
+export async function addProductosOrden(
+  id: number,
+  Productos: { IdProducto: number; Cantidad?: number; Notas?: string }[]
+): Promise<{ IdOrden: number; Version: number; Productos: { IdProducto: number; Cantidad: number; Nuevo: boolean }[] }> {
+  return request(`/api/ordenes/${id}/productos/`, {
+    method: 'POST',
+    body: JSON.stringify({ Productos }),
+  });
+}
+
+export interface OrdenEstadoLoteResultado {
+  IdOrden: number;
+  ok: boolean;
+  IdEstado?: number;
+  Version?: number;
+  FechaEstado?: string;
+  error?: string;
+}
+
+// Cambia varias órdenes al mismo estado; cada una trae su propio resultado
+export async function updateOrdenesEstado(
+  IdOrdenes: number[],
+  IdEstado: number
+): Promise<{ IdEstado: number; cambiadas: number; resultados: OrdenEstadoLoteResultado[] }> {
+  return request(`/api/ordenes/estado/`, {
+    method: 'PATCH',
+    body: JSON.stringify({ IdOrdenes, IdEstado }),
   });
 }
 
@@ -193,8 +318,11 @@ export async function getEstados(): Promise<EstadoResponse[]> {
 }
 
 // Función para guardar token
-export function saveToken(token: string): void {
+export function saveToken(token: string, refresh?: string): void {
   localStorage.setItem('token', token);
+  if (refresh) {
+    localStorage.setItem('refresh', refresh);
+  }
 }
 
 // Función para obtener token
@@ -205,5 +333,6 @@ export function getToken(): string | null {
 // Función para eliminar token
 export function removeToken(): void {
   localStorage.removeItem('token');
+  localStorage.removeItem('refresh');
 }
 